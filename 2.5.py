@@ -3,24 +3,83 @@
 Реализует пункты 4 и 5 (Singleton).
 """
 
+import csv
+import io
+import sys
+import tempfile
+import time
+from itertools import islice
 import psycopg2
-from psycopg2.extras import RealDictCursor
-from typing import List, Optional, Dict, Any, Callable
+from psycopg2.extras import RealDictCursor, execute_values
+from typing import List, Optional, Dict, Any, IO, Iterable, Iterator, Sequence, Tuple
 from entities import Customer, ShortCustomer, ValidationError
 from repository_base import CustomerRepBase, SortField
+from pagination import encode_cursor, decode_cursor, PageResult, page_count, query_page, SortKey
+from customer_list import CustomerList, CustomerSnapshot
+from deferred_loading import DeferredLoadMixin, needs_data
+from predicates import Filter, Predicate
+from connection_pool import ConnectionPool, PoolStats
+
+
+class _CsvStream:
+    """
+    Файлоподобный источник для COPY FROM STDIN.
+    Строки CSV формируются порциями по мере чтения, поэтому весь пакет
+    не собирается в памяти одной строкой.
+    """
+
+    CHUNK_ROWS = 1000
+
+    def __init__(self, rows: Iterable[tuple]):
+        self._rows: Optional[Iterator[tuple]] = iter(rows)
+        self._buffer = io.StringIO()
+        self._writer = csv.writer(self._buffer, lineterminator="\n")
+        self._pending = ""
+
+    def read(self, size: int = -1) -> str:
+        while self._rows is not None and (size < 0 or len(self._pending) < size):
+            chunk = list(islice(self._rows, self.CHUNK_ROWS))
+            if not chunk:
+                self._rows = None
+                break
+            self._buffer.seek(0)
+            self._buffer.truncate()
+            self._writer.writerows(chunk)
+            self._pending += self._buffer.getvalue()
+        if size < 0 or len(self._pending) <= size:
+            data, self._pending = self._pending, ""
+        else:
+            data, self._pending = self._pending[:size], self._pending[size:]
+        return data
 
 
 class DBConnection:
-    """Singleton для управления подключением к базе данных."""
+    """
+    Singleton для управления подключением к базе данных.
+    Запросы выполняются на подключениях из общего пула, а не открывают
+    новое подключение каждый раз.
+    """
 
     _instance: Optional["DBConnection"] = None
 
-    def __new__(cls, db_config: Optional[Dict[str, Any]] = None) -> "DBConnection":
+    def __new__(
+        cls,
+        db_config: Optional[Dict[str, Any]] = None,
+        min_size: int = 1,
+        max_size: int = 10,
+        timeout: float = 30.0,
+        health_check_interval: float = 30.0,
+    ) -> "DBConnection":
         """
         Создание или получение существующего экземпляра подключения.
+        Параметры пула учитываются только при первом создании.
 
         Args:
             db_config: конфигурация подключения к БД
+            min_size: число подключений, открываемых сразу
+            max_size: наибольшее число подключений
+            timeout: наибольшее время ожидания свободного подключения, с
+            health_check_interval: после какого простоя подключение проверяется, с
 
         Returns:
             Единственный экземпляр подключения
@@ -30,10 +89,24 @@ class DBConnection:
                 raise ValueError(
                     "Конфигурация БД должна быть передана при первом создании!"
                 )
-            cls._instance = super().__new__(cls)
-            cls._instance._db_config = db_config
+            instance = super().__new__(cls)
+            instance._db_config = db_config
+            instance._pool = ConnectionPool(
+                db_config, min_size, max_size, timeout, health_check_interval
+            )
+            cls._instance = instance
         return cls._instance
 
+    def pool_stats(self) -> PoolStats:
+        """Метрики пула: размер, время ожидания подключения и загрузка."""
+        return self._pool.stats()
+
+    def close(self) -> None:
+        """Закрыть подключения пула и сбросить Singleton."""
+        self._pool.close()
+        if DBConnection._instance is self:
+            DBConnection._instance = None
+
     def execute_query(
         self, query: str, params: Optional[tuple] = None, fetch: bool = False
     ) -> Any:
@@ -49,7 +122,7 @@ class DBConnection:
             Результаты запроса или None
         """
         try:
-            with psycopg2.connect(**self._db_config) as conn:
+            with self._pool.connection() as conn:
                 with conn.cursor(cursor_factory=RealDictCursor) as cursor:
                     cursor.execute(query, params)
                     if fetch:
@@ -59,6 +132,93 @@ class DBConnection:
             print(f"Ошибка выполнения запроса: {e}")
             return None
 
+    def execute_bulk(
+        self,
+        query: str,
+        rows: List[tuple],
+        fetch: bool = False,
+        page_size: int = 1000,
+    ) -> Any:
+        """
+        Выполнить запрос с многострочным VALUES %s для пакета строк.
+
+        Args:
+            query: SQL запрос с плейсхолдером VALUES %s
+            rows: кортежи значений
+            fetch: флаг получения результатов (RETURNING)
+            page_size: число строк в одном операторе
+
+        Returns:
+            Результаты запроса, True без fetch или None при ошибке
+        """
+        try:
+            with self._pool.connection() as conn:
+                with conn.cursor(cursor_factory=RealDictCursor) as cursor:
+                    result = execute_values(cursor, query, rows, page_size=page_size, fetch=fetch)
+                    conn.commit()
+                    return result if fetch else True
+        except psycopg2.Error as e:
+            print(f"Ошибка пакетного запроса: {e}")
+            return None
+
+    def copy_in(self, query: str, stream: Any, size: int = 65536) -> Optional[int]:
+        """
+        Загрузить данные командой COPY ... FROM STDIN.
+
+        Args:
+            query: команда COPY
+            stream: файлоподобный объект с методом read
+            size: размер блока, передаваемого серверу
+
+        Returns:
+            Количество загруженных строк или None при ошибке
+        """
+        try:
+            with self._pool.connection() as conn:
+                with conn.cursor() as cursor:
+                    cursor.copy_expert(query, stream, size)
+                    return cursor.rowcount
+        except psycopg2.Error as e:
+            print(f"Ошибка COPY: {e}")
+            return None
+
+    def copy_out(self, query: str, stream: IO, size: int = 65536) -> Optional[int]:
+        """
+        Выгрузить данные командой COPY ... TO STDOUT.
+        Данные пишутся в stream по мере получения от сервера.
+
+        Returns:
+            Количество выгруженных строк или None при ошибке
+        """
+        try:
+            with self._pool.connection() as conn:
+                with conn.cursor() as cursor:
+                    cursor.copy_expert(query, stream, size)
+                    return cursor.rowcount
+        except psycopg2.Error as e:
+            print(f"Ошибка COPY: {e}")
+            return None
+
+    def execute_transaction(self, statements: Sequence[Tuple[str, Optional[tuple]]]) -> bool:
+        """
+        Выполнить несколько запросов в одной транзакции.
+
+        Args:
+            statements: пары (SQL запрос, параметры)
+
+        Returns:
+            True, если транзакция зафиксирована; при ошибке всё откатывается
+        """
+        try:
+            with self._pool.connection() as conn:
+                with conn.cursor() as cursor:
+                    for query, params in statements:
+                        cursor.execute(query, params)
+            return True
+        except psycopg2.Error as e:
+            print(f"Ошибка выполнения транзакции: {e}")
+            return False
+
     def execute_insert(self, query: str, params: Optional[tuple] = None) -> Optional[int]:
         """
         Выполнить INSERT запрос с возвратом ID.
@@ -71,7 +231,7 @@ class DBConnection:
             ID новой записи
         """
         try:
-            with psycopg2.connect(**self._db_config) as conn:
+            with self._pool.connection() as conn:
                 with conn.cursor() as cursor:
                     cursor.execute(query, params)
                     new_id = cursor.fetchone()[0]
@@ -82,23 +242,87 @@ class DBConnection:
             return None
 
 
-class CustomerRepDB(CustomerRepBase):
+class CustomerRepDB(DeferredLoadMixin, CustomerRepBase):
     """Репозиторий для работы с базой данных PostgreSQL."""
 
-    def __init__(self, db_config: Optional[Dict[str, Any]] = None):
+    # SQL-выражения ключей сортировки (совпадают с ключами сортировки в памяти)
+    _SORT_EXPRESSIONS = {
+        SortField.CUSTOMER_ID: "customer_id",
+        SortField.NAME: "lower(name)",
+        SortField.ADDRESS: "lower(address)",
+        SortField.PHONE: "phone",
+        SortField.CONTACT_PERSON: "lower(contact_person)",
+    }
+
+    # Версии схемы: (номер, описание, запросы). Каждая версия применяется
+    # в одной транзакции вместе с записью в schema_version и больше
+    # не повторяется. Изменения схемы добавляются новой версией в конец,
+    # уже выпущенные версии не редактируются
+    _MIGRATIONS: Tuple[Tuple[int, str, Tuple[str, ...]], ...] = (
+        (1, "таблица клиентов", (
+            """
+            CREATE TABLE IF NOT EXISTS customers (
+                customer_id SERIAL PRIMARY KEY,
+                name VARCHAR(100) NOT NULL,
+                address VARCHAR(200),
+                phone VARCHAR(20),
+                contact_person VARCHAR(100)
+            )
+            """,
+        )),
+        # Индексы совпадают с выражениями _SORT_EXPRESSIONS и вторым ключом
+        # customer_id, поэтому ORDER BY и keyset-условия идут по индексу
+        (2, "индексы сортировки по SortField", (
+            "CREATE INDEX IF NOT EXISTS customers_name_sort_idx ON customers (lower(name), customer_id)",
+            "CREATE INDEX IF NOT EXISTS customers_address_sort_idx ON customers (lower(address), customer_id)",
+            "CREATE INDEX IF NOT EXISTS customers_phone_sort_idx ON customers (phone, customer_id)",
+            "CREATE INDEX IF NOT EXISTS customers_contact_person_sort_idx"
+            " ON customers (lower(contact_person), customer_id)",
+        )),
+        # Условия prefix/contains из predicates дают lower(поле) LIKE '...%' и
+        # '%...%': такие шаблоны ищутся по триграммным GIN-индексам
+        (3, "триграммные индексы для поиска подстроки", (
+            "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+            "CREATE INDEX IF NOT EXISTS customers_name_trgm_idx ON customers USING gin (lower(name) gin_trgm_ops)",
+            "CREATE INDEX IF NOT EXISTS customers_address_trgm_idx"
+            " ON customers USING gin (lower(address) gin_trgm_ops)",
+            "CREATE INDEX IF NOT EXISTS customers_contact_person_trgm_idx"
+            " ON customers USING gin (lower(contact_person) gin_trgm_ops)",
+        )),
+        # Не применится, пока в таблице есть повторяющиеся телефоны. Уникальный
+        # индекс по phone заменяет индекс сортировки (phone, customer_id):
+        # при уникальном телефоне второй ключ порядок не меняет
+        (4, "уникальный телефон", (
+            "CREATE UNIQUE INDEX IF NOT EXISTS customers_phone_key ON customers (phone)",
+            "DROP INDEX IF EXISTS customers_phone_sort_idx",
+        )),
+    )
+
+    # Версии, от которых не зависят следующие. Если такая версия не применилась
+    # (например, на сервере нет расширения pg_trgm), следующие всё равно
+    # применяются, а она повторяется при следующем запуске
+    _OPTIONAL_MIGRATIONS = frozenset({3})
+
+    def __init__(self, db_config: Optional[Dict[str, Any]] = None, load: str = "eager"):
         """
         Инициализация репозитория БД.
 
         Args:
             db_config: конфигурация подключения к БД
+            load: режим загрузки: "eager" — в конструкторе, "lazy" — при первом
+                обращении, "background" — в фоновом потоке
         """
         self._db_config = db_config
         self._db: Optional[DBConnection] = None
-        self._data_list: List[Customer] = []
+        self._data_list = CustomerList()
+        self._id_sequence: Optional[str] = None
+        self._start_loading(load, self._connect)
 
-        if db_config:
+    def _connect(self) -> None:
+        """Подключиться к БД, подготовить таблицу и прочитать данные."""
+        if self._db_config:
             try:
-                self._db = DBConnection(db_config)
+                self._db = DBConnection(self._db_config)
                 self._initialize_table()
                 self.read_from_file()
             except Exception as e:
@@ -106,26 +330,126 @@ class CustomerRepDB(CustomerRepBase):
                 self._db = None
 
     def _initialize_table(self) -> None:
-        """Инициализировать таблицу в БД, если её нет."""
-        if self._db:
-            query = """
-            CREATE TABLE IF NOT EXISTS customers (
-                customer_id SERIAL PRIMARY KEY,
-                name VARCHAR(100) NOT NULL,
-                address VARCHAR(200),
-                phone VARCHAR(20),
-                contact_person VARCHAR(100)
+        """
+        Применить версии из _MIGRATIONS, которых ещё нет в schema_version.
+        Если обязательная версия не применилась, следующие не выполняются;
+        необязательная (_OPTIONAL_MIGRATIONS) пропускается до следующего запуска.
+        """
+        if not self._db:
+            return
+        self._db.execute_query("""
+            CREATE TABLE IF NOT EXISTS schema_version (
+                version INTEGER PRIMARY KEY,
+                description TEXT NOT NULL,
+                applied_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
             )
-            """
-            self._db.execute_query(query)
+        """)
+        rows = self._db.execute_query("SELECT version FROM schema_version", fetch=True)
+        if rows is None:
+            return
+        applied = {row["version"] for row in rows}
+        for version, description, statements in self._MIGRATIONS:
+            if version in applied:
+                continue
+            ok = self._db.execute_transaction(
+                [(query, None) for query in statements]
+                + [("INSERT INTO schema_version (version, description) VALUES (%s, %s)", (version, description))]
+            )
+            if ok:
+                applied.add(version)
+            elif version in self._OPTIONAL_MIGRATIONS:
+                print(f"Пропущена необязательная версия схемы {version} ({description})")
+            else:
+                print(f"Схема остановлена: не применена версия {version} ({description})")
+                break
+
+    @property
+    def schema_version(self) -> int:
+        """
+        Номер последней применённой версии схемы (0 без подключения).
+        Пропущенные необязательные версии перечислены в missing_migrations.
+        """
+        if not self._db:
+            return 0
+        rows = self._db.execute_query(
+            "SELECT COALESCE(MAX(version), 0) AS version FROM schema_version", fetch=True
+        )
+        return rows[0]["version"] if rows else 0
+
+    @property
+    def missing_migrations(self) -> List[int]:
+        """Версии из _MIGRATIONS, которые ещё не применены."""
+        if not self._db:
+            return [version for version, _, _ in self._MIGRATIONS]
+        rows = self._db.execute_query("SELECT version FROM schema_version", fetch=True) or []
+        applied = {row["version"] for row in rows}
+        return [version for version, _, _ in self._MIGRATIONS if version not in applied]
+
+    def explain(self, query: str, params: Optional[tuple] = None, analyze: bool = False) -> List[str]:
+        """
+        План выполнения запроса.
+
+        Args:
+            query: SQL запрос
+            params: параметры запроса
+            analyze: выполнить запрос и показать фактическое время (EXPLAIN ANALYZE);
+                запросы, изменяющие данные, при этом тоже выполняются
+
+        Returns:
+            Строки плана
+        """
+        if not self._db:
+            return []
+        prefix = "EXPLAIN (ANALYZE, BUFFERS) " if analyze else "EXPLAIN "
+        rows = self._db.execute_query(prefix + query, params, fetch=True)
+        return [row["QUERY PLAN"] for row in rows or []]
+
+    def explain_query(
+        self,
+        k: int,
+        n: int,
+        condition: Optional[Predicate] = None,
+        sort_key: Optional[SortField] = None,
+        reverse: bool = False,
+        analyze: bool = False,
+    ) -> List[str]:
+        """
+        План запроса страницы, который выполняет query() для условия и поля сортировки.
+        Позволяет проверить, что поиск и сортировка идут по индексам.
+        """
+        return self.explain(*self._page_query(k, n, condition, sort_key, reverse), analyze=analyze)
+
+    def _page_query(
+        self,
+        k: int,
+        n: int,
+        condition: Optional[Predicate],
+        sort_key: Optional[SortField],
+        reverse: bool,
+    ) -> Tuple[str, tuple]:
+        """SQL страницы с общим количеством: условие в WHERE, порядок по полю SortField."""
+        # Без ключа сортировки порядок — по ID, reverse не учитывается (как в query_page)
+        order_by = self._order_by(sort_key or SortField.CUSTOMER_ID, reverse and sort_key is not None)
+        where, params = self._where(condition)
+        # Количество — отдельным подзапросом, а не COUNT(*) OVER(): оконной
+        # функции нужны все строки до LIMIT, и ORDER BY не может идти по индексу
+        query = f"""
+            SELECT customer_id, name, phone, (SELECT COUNT(*) FROM customers {where}) AS total
+            FROM customers
+            {where}
+            {order_by}
+            LIMIT %s OFFSET %s
+        """
+        return query, tuple(params + params + [n, (k - 1) * n])
 
+    @needs_data
     def read_from_file(self) -> None:
         """Чтение данных из таблицы customers."""
         if self._db:
             query = "SELECT * FROM customers ORDER BY customer_id"
             rows = self._db.execute_query(query, fetch=True)
             if rows:
-                self._data_list = []
+                self._data_list = CustomerList()
                 for row in rows:
                     try:
                         customer = Customer(
@@ -144,6 +468,7 @@ class CustomerRepDB(CustomerRepBase):
         """Для БД изменения сохраняются сразу при операциях."""
         pass
 
+    @needs_data
     def get_by_id(self, c_id: int) -> Optional[Customer]:
         """Получить клиента по ID из БД."""
         if self._db:
@@ -163,66 +488,195 @@ class CustomerRepDB(CustomerRepBase):
                     print(f"Ошибка валидации данных: {e}")
         return None
 
+    @needs_data
     def get_k_n_short_list(
         self,
         k: int,
         n: int,
-        filter_func: Optional[Callable[[Customer], bool]] = None,
-        sort_key: Optional[Callable[[Customer], Any]] = None,
+        filter_func: Optional[Filter] = None,
+        sort_key: Optional[SortKey] = None,
         reverse: bool = False,
     ) -> List[ShortCustomer]:
         """Получить короткий список клиентов с пагинацией из БД."""
-        # Сначала получаем все данные
-        self.read_from_file()
+        return self.query(k, n, filter_func, sort_key, reverse).items
 
-        # Фильтрация в памяти (для простоты)
-        filtered_data = (
-            self._data_list
-            if filter_func is None
-            else [c for c in self._data_list if filter_func(c)]
-        )
+    @needs_data
+    def query(
+        self,
+        k: int,
+        n: int,
+        filter_func: Optional[Filter] = None,
+        sort_key: Optional[SortKey] = None,
+        reverse: bool = False,
+    ) -> PageResult:
+        """
+        Получить страницу, общее количество и число страниц за один запрос.
+        Если ключ сортировки — поле SortField (или не задан), порядок, LIMIT/OFFSET
+        и общее количество вычисляет БД, и передаются только строки страницы.
+        Условие Predicate выполняется в WHERE. Функцию фильтрации БД выполнить
+        не может: тогда строки приходят уже упорядоченными и в памяти только
+        фильтруются. Произвольная функция сортировки обрабатывается целиком в памяти.
 
-        # Сортировка
-        if sort_key:
-            filtered_data.sort(key=sort_key, reverse=reverse)
-        else:
-            filtered_data.sort(key=lambda x: x.customer_id)
+        Args:
+            k: номер страницы
+            n: количество элементов на странице
+            filter_func: условие Predicate или функция фильтрации
+            sort_key: поле SortField или функция сортировки
+            reverse: обратный порядок сортировки
 
-        # Пагинация
+        Returns:
+            PageResult со списком ShortCustomer
+        """
         start = (k - 1) * n
-        end = start + n
-        paginated_data = filtered_data[start:end]
+        if self._db and (sort_key is None or isinstance(sort_key, SortField)):
+            if filter_func is None or isinstance(filter_func, Predicate):
+                query, params = self._page_query(k, n, filter_func, sort_key, reverse)
+                rows = self._db.execute_query(query, params, fetch=True)
+                if rows is not None:
+                    # За пределами данных строк нет и подзапросу негде вернуть итог
+                    total = rows[0]["total"] if rows else self.get_count(filter_func)
+                    items = [ShortCustomer(row["customer_id"], row["name"], row["phone"]) for row in rows]
+                    return PageResult(items, total, page_count(total, n))
+            else:
+                order_by = self._order_by(sort_key or SortField.CUSTOMER_ID, reverse and sort_key is not None)
+                rows = self._db.execute_query(f"SELECT * FROM customers {order_by}", fetch=True)
+                if rows is not None:
+                    matching = []
+                    for row in rows:
+                        customer = self._row_to_customer(row)
+                        if customer is not None and filter_func(customer):
+                            matching.append(customer)
+                    items = [ShortCustomer(c.customer_id, c.name, c.phone) for c in matching[start:start + n]]
+                    return PageResult(items, len(matching), page_count(len(matching), n))
 
-        # Преобразуем в ShortCustomer
-        result = []
-        for customer in paginated_data:
-            result.append(ShortCustomer(customer.customer_id, customer.name, customer.phone))
-        return result
+        # Сначала получаем все данные, фильтрация в памяти
+        self.read_from_file()
+        result = query_page(self._data_list, k, n, filter_func, sort_key, reverse)
+        items = [ShortCustomer(c.customer_id, c.name, c.phone) for c in result.items]
+        return result._replace(items=items)
 
-    def sort_by_field(self, field: SortField, reverse: bool = False) -> None:
-        """Отсортировать клиентов по указанному полю в БД."""
+    @needs_data
+    def get_page(
+        self,
+        n: int,
+        cursor: Optional[str] = None,
+        filter_func: Optional[Filter] = None,
+        sort_field: SortField = SortField.CUSTOMER_ID,
+        reverse: bool = False,
+    ) -> Tuple[List[ShortCustomer], Optional[str]]:
+        """
+        Получить страницу по курсору (keyset-пагинация).
+        Продолжение передаётся в БД как WHERE (ключ, id) > (...), поэтому
+        глубокие страницы стоят столько же, сколько первая.
+
+        Args:
+            n: размер страницы
+            cursor: курсор предыдущей страницы (None — первая страница)
+            filter_func: условие Predicate (выполняется в WHERE) или функция
+                фильтрации (применяется к строкам по мере чтения)
+            sort_field: поле сортировки
+            reverse: обратный порядок
+
+        Returns:
+            Страница и курсор следующей страницы (None, если она последняя)
+        """
         if not self._db:
-            return
+            return [], None
+        if sort_field not in self._SORT_EXPRESSIONS:
+            raise ValueError(f"Поле {sort_field} недоступно для сортировки")
 
-        field_mapping = {
-            SortField.CUSTOMER_ID: "customer_id",
-            SortField.NAME: "name",
-            SortField.ADDRESS: "address",
-            SortField.PHONE: "phone",
-            SortField.CONTACT_PERSON: "contact_person",
-        }
+        expression = self._SORT_EXPRESSIONS[sort_field]
+        order = "DESC" if reverse else "ASC"
+        operator = "<" if reverse else ">"
+        position = decode_cursor(cursor) if cursor else None
+        where, where_params = "", []
+        if isinstance(filter_func, Predicate):
+            where, where_params = filter_func.to_sql()
+            filter_func = None
+        # С фильтром-функцией строки читаются пачками, пока страница не заполнится
+        batch_size = n + 1 if filter_func is None else max(n * 4, 100)
 
-        if field not in field_mapping:
-            raise ValueError(f"Поле {field} недоступно для сортировки")
+        page: List[ShortCustomer] = []
+        last_position = None
+        while True:
+            conditions, params = [f"({where})"] if where else [], list(where_params)
+            if position is not None:
+                if sort_field == SortField.CUSTOMER_ID:
+                    conditions.append(f"customer_id {operator} %s")
+                    params.append(position[1])
+                else:
+                    conditions.append(f"({expression}, customer_id) {operator} (%s, %s)")
+                    params.extend(position)
+            where_clause = "WHERE " + " AND ".join(conditions) if conditions else ""
+            query = f"""
+                SELECT *, {expression} AS sort_key FROM customers
+                {where_clause}
+                ORDER BY {expression} {order}, customer_id {order}
+                LIMIT %s
+            """
+            rows = self._db.execute_query(query, tuple(params + [batch_size]), fetch=True) or []
 
-        sql_field = field_mapping[field]
+            for row in rows:
+                position = (row["sort_key"], row["customer_id"])
+                if filter_func is not None:
+                    customer = self._row_to_customer(row)
+                    if customer is None or not filter_func(customer):
+                        continue
+                if len(page) == n:
+                    return page, encode_cursor(*last_position)
+                page.append(ShortCustomer(row["customer_id"], row["name"], row["phone"]))
+                last_position = position
+
+            if len(rows) < batch_size:
+                return page, None
+
+    @staticmethod
+    def _where(condition: Optional[Predicate]) -> Tuple[str, List[Any]]:
+        """Предложение WHERE и его параметры для условия (пустое без условия)."""
+        if condition is None:
+            return "", []
+        sql, params = condition.to_sql()
+        return f"WHERE {sql}", params
+
+    @classmethod
+    def _order_by(cls, field: SortField, reverse: bool = False) -> str:
+        """
+        Выражение ORDER BY для поля сортировки.
+        ID добавляется вторым ключом, чтобы порядок страниц был однозначным.
+        """
+        if field not in cls._SORT_EXPRESSIONS:
+            raise ValueError(f"Поле {field} недоступно для сортировки")
         order = "DESC" if reverse else "ASC"
+        if field == SortField.CUSTOMER_ID:
+            return f"ORDER BY customer_id {order}"
+        return f"ORDER BY {cls._SORT_EXPRESSIONS[field]} {order}, customer_id {order}"
+
+    @staticmethod
+    def _row_to_customer(row: Dict[str, Any]) -> Optional[Customer]:
+        """Создать Customer из строки таблицы (None при ошибке валидации)."""
+        try:
+            return Customer(
+                customer_id=row["customer_id"],
+                name=row["name"],
+                address=row["address"],
+                phone=row["phone"],
+                contact_person=row["contact_person"],
+            )
+        except ValidationError as e:
+            print(f"Ошибка валидации данных: {e}")
+            return None
+
+    @needs_data
+    def sort_by_field(self, field: SortField, reverse: bool = False) -> None:
+        """Отсортировать клиентов по указанному полю в БД."""
+        if not self._db:
+            return
 
-        query = f"SELECT * FROM customers ORDER BY {sql_field} {order}"
+        query = f"SELECT * FROM customers {self._order_by(field, reverse)}"
         rows = self._db.execute_query(query, fetch=True)
 
         if rows:
-            self._data_list = []
+            self._data_list = CustomerList()
             for row in rows:
                 try:
                     customer = Customer(
@@ -237,6 +691,7 @@ class CustomerRepDB(CustomerRepBase):
                     print(f"Ошибка валидации данных: {e}")
                     continue
 
+    @needs_data
     def add(self, new_customer: Customer) -> bool:
         """Добавить клиента в БД."""
         if self._db:
@@ -257,6 +712,7 @@ class CustomerRepDB(CustomerRepBase):
                 return True
         return False
 
+    @needs_data
     def replace_by_id(self, c_id: int, new_customer: Customer) -> bool:
         """Заменить клиента по ID в БД."""
         if self._db:
@@ -269,6 +725,7 @@ class CustomerRepDB(CustomerRepBase):
                 UPDATE customers 
                 SET name = %s, address = %s, phone = %s, contact_person = %s
                 WHERE customer_id = %s
+                RETURNING customer_id
             """
             params = (
                 new_customer.name,
@@ -277,16 +734,15 @@ class CustomerRepDB(CustomerRepBase):
                 new_customer.contact_person,
                 c_id,
             )
-            result = self._db.execute_query(query, params)
-            if result is not None:
+            result = self._db.execute_query(query, params, fetch=True)
+            if result:
                 # Обновить локальный список
                 new_customer.customer_id = c_id
-                for i, customer in enumerate(self._data_list):
-                    if customer.customer_id == c_id:
-                        self._data_list[i] = new_customer
-                        return True
+                self._data_list.replace(c_id, new_customer)
+                return True
         return False
 
+    @needs_data
     def delete_by_id(self, c_id: int) -> bool:
         """Удалить клиента по ID из БД."""
         if self._db:
@@ -295,20 +751,212 @@ class CustomerRepDB(CustomerRepBase):
             if not existing:
                 return False
 
-            query = "DELETE FROM customers WHERE customer_id = %s"
-            result = self._db.execute_query(query, (c_id,))
-            if result is not None:
-                # Удалить из локального списка
-                for i, customer in enumerate(self._data_list):
-                    if customer.customer_id == c_id:
-                        del self._data_list[i]
-                        return True
+            query = "DELETE FROM customers WHERE customer_id = %s RETURNING customer_id"
+            result = self._db.execute_query(query, (c_id,), fetch=True)
+            if result:
+                # Пометить удалённым в локальном списке (без сдвига элементов)
+                self._data_list.remove(c_id)
+                return True
         return False
 
+    @needs_data
+    def add_many(self, customers: List[Customer]) -> int:
+        """
+        Добавить клиентов пакетом.
+        ID выделяются одним запросом к последовательности таблицы,
+        строки вставляются многострочным INSERT.
+
+        Args:
+            customers: новые клиенты
+
+        Returns:
+            Количество добавленных клиентов
+        """
+        customers = list(customers)
+        if not self._db or not customers:
+            return 0
+
+        ids = self._allocate_ids(len(customers))
+        if ids is None:
+            return 0
+
+        rows = [
+            (c_id, c.name, c.address, c.phone, c.contact_person)
+            for c_id, c in zip(ids, customers)
+        ]
+        query = """
+            INSERT INTO customers (customer_id, name, address, phone, contact_person)
+            VALUES %s
+        """
+        if self._db.execute_bulk(query, rows) is None:
+            return 0
+
+        for c_id, customer in zip(ids, customers):
+            customer.customer_id = c_id
+        self._data_list.extend(customers)
+        return len(customers)
+
+    @needs_data
+    def bulk_import(self, customers: Iterable[Customer], batch_size: int = 100_000) -> int:
+        """
+        Загрузить большое количество клиентов командой COPY FROM STDIN.
+        Клиенты читаются пачками по batch_size; для каждой пачки ID выделяются
+        заранее, строки передаются потоком CSV, и пачка фиксируется отдельно.
+        При ошибке загрузка останавливается, уже загруженные пачки остаются.
+
+        Args:
+            customers: новые клиенты (список или генератор)
+            batch_size: число клиентов в одной транзакции COPY
+
+        Returns:
+            Количество загруженных клиентов
+        """
+        if not self._db:
+            return 0
+
+        query = """
+            COPY customers (customer_id, name, address, phone, contact_person)
+            FROM STDIN WITH (FORMAT csv)
+        """
+        loaded = 0
+        customers = iter(customers)
+        while True:
+            batch = list(islice(customers, batch_size))
+            if not batch:
+                break
+            ids = self._allocate_ids(len(batch))
+            if ids is None:
+                break
+            rows = (
+                (c_id, c.name, c.address, c.phone, c.contact_person)
+                for c_id, c in zip(ids, batch)
+            )
+            if self._db.copy_in(query, _CsvStream(rows)) is None:
+                break
+            for c_id, customer in zip(ids, batch):
+                customer.customer_id = c_id
+            self._data_list.extend(batch)
+            loaded += len(batch)
+        return loaded
+
+    @needs_data
+    def bulk_export(self, stream: IO[str], header: bool = True) -> Optional[int]:
+        """
+        Выгрузить всех клиентов в CSV командой COPY TO STDOUT.
+        Строки пишутся в stream по мере получения, без загрузки таблицы в память.
+
+        Args:
+            stream: текстовый файлоподобный объект с методом write
+            header: записать строку с именами столбцов
+
+        Returns:
+            Количество выгруженных клиентов или None при ошибке
+        """
+        if not self._db:
+            return None
+        options = "FORMAT csv, HEADER" if header else "FORMAT csv"
+        query = f"""
+            COPY (
+                SELECT customer_id, name, address, phone, contact_person
+                FROM customers ORDER BY customer_id
+            ) TO STDOUT WITH ({options})
+        """
+        return self._db.copy_out(query, stream)
+
+    def _allocate_ids(self, count: int) -> Optional[List[int]]:
+        """
+        Выделить count ID из последовательности таблицы одним запросом.
+        Имя последовательности определяется один раз: pg_get_serial_sequence
+        в самом запросе вычислялась бы для каждой строки generate_series.
+        ID возвращаются одним массивом, а не строкой на каждый ID.
+        """
+        if self._id_sequence is None:
+            rows = self._db.execute_query(
+                "SELECT pg_get_serial_sequence('customers', 'customer_id') AS name", fetch=True
+            )
+            if not rows:
+                return None
+            self._id_sequence = rows[0]["name"]
+
+        query = """
+            SELECT array_agg(nextval(%s::regclass)) AS ids
+            FROM generate_series(1, %s)
+        """
+        rows = self._db.execute_query(query, (self._id_sequence, count), fetch=True)
+        if not rows or not rows[0]["ids"] or len(rows[0]["ids"]) != count:
+            return None
+        return rows[0]["ids"]
+
+    @needs_data
+    def replace_many(self, replacements: Dict[int, Customer]) -> int:
+        """
+        Заменить клиентов пакетом одним UPDATE ... FROM (VALUES ...).
+
+        Args:
+            replacements: словарь {ID: новые данные клиента}
+
+        Returns:
+            Количество заменённых клиентов
+        """
+        if not self._db or not replacements:
+            return 0
+
+        query = """
+            UPDATE customers AS c
+            SET name = v.name, address = v.address,
+                phone = v.phone, contact_person = v.contact_person
+            FROM (VALUES %s) AS v (customer_id, name, address, phone, contact_person)
+            WHERE c.customer_id = v.customer_id
+            RETURNING c.customer_id
+        """
+        rows = [
+            (c_id, c.name, c.address, c.phone, c.contact_person)
+            for c_id, c in replacements.items()
+        ]
+        result = self._db.execute_bulk(query, rows, fetch=True)
+        if result is None:
+            return 0
+
+        replaced = {row["customer_id"] for row in result}
+        for c_id in replaced:
+            replacements[c_id].customer_id = c_id
+            self._data_list.replace(c_id, replacements[c_id])
+        return len(replaced)
+
+    @needs_data
+    def delete_many(self, ids: List[int]) -> int:
+        """
+        Удалить клиентов пакетом одним DELETE ... WHERE customer_id = ANY(...).
+
+        Args:
+            ids: ID удаляемых клиентов
+
+        Returns:
+            Количество удалённых клиентов
+        """
+        ids = list(set(ids))
+        if not self._db or not ids:
+            return 0
+
+        query = "DELETE FROM customers WHERE customer_id = ANY(%s) RETURNING customer_id"
+        rows = self._db.execute_query(query, (ids,), fetch=True)
+        if rows is None:
+            return 0
+
+        deleted = {row["customer_id"] for row in rows}
+        self._data_list.remove_many(deleted)
+        return len(deleted)
+
+    @needs_data
     def get_count(
-        self, filter_func: Optional[Callable[[Customer], bool]] = None
+        self, filter_func: Optional[Filter] = None
     ) -> int:
-        """Получить количество клиентов из БД."""
+        """Получить количество клиентов из БД (условие Predicate считается в SQL)."""
+        if isinstance(filter_func, Predicate) and self._db:
+            where, params = self._where(filter_func)
+            rows = self._db.execute_query(f"SELECT COUNT(*) as count FROM customers {where}", tuple(params), fetch=True)
+            if rows:
+                return rows[0]["count"]
         if filter_func is None:
             if self._db:
                 query = "SELECT COUNT(*) as count FROM customers"
@@ -320,6 +968,70 @@ class CustomerRepDB(CustomerRepBase):
             # Фильтрация в памяти
             return len([c for c in self._data_list if filter_func(c)])
 
-    def get_all(self) -> List[Customer]:
-        """Получить всех клиентов."""
-        return self._data_list.copy()
\ No newline at end of file
+    @needs_data
+    def get_all(self) -> Sequence[Customer]:
+        """Получить всех клиентов (неизменяемый снимок, без копирования)."""
+        return self.snapshot()
+
+    @needs_data
+    def snapshot(self) -> CustomerSnapshot:
+        """
+        Получить неизменяемый снимок текущей версии данных за O(1).
+        Снимок можно обходить, пока репозиторий продолжает изменяться.
+        """
+        return self._data_list.snapshot()
+
+
+def bench_bulk_insert(db_config: Dict[str, Any], count: int = 500_000, add_count: int = 2_000) -> None:
+    """
+    Сравнение скорости добавления: add по одному, add_many (многострочный
+    INSERT) и bulk_import (COPY), а также выгрузки bulk_export.
+    Запускать на тестовой БД: добавленные клиенты в конце удаляются.
+
+    Args:
+        db_config: параметры подключения
+        count: число клиентов для пакетных способов
+        add_count: число клиентов для add (по одному запросу на клиента)
+    """
+    repository = CustomerRepDB(db_config)
+
+    def make(tag: int, size: int) -> List[Customer]:
+        return [
+            Customer(
+                customer_id=0,
+                name=f"Клиент {i}",
+                address=f'г. Москва, ул. "Тестовая", д. {i}',
+                phone=f"+7{tag}{i:09d}",
+                contact_person=f"Контакт {i}",
+            )
+            for i in range(size)
+        ]
+
+    created: List[int] = []
+    print(f"{'способ':>12} {'клиентов':>10} {'время, с':>10} {'строк/с':>10}")
+    for title, tag, size, run in (
+        ("add", 1, add_count, lambda batch: sum(repository.add(c) for c in batch)),
+        ("add_many", 2, count, repository.add_many),
+        ("COPY", 3, count, repository.bulk_import),
+    ):
+        batch = make(tag, size)
+        t0 = time.perf_counter()
+        added = run(batch)
+        elapsed = time.perf_counter() - t0
+        created.extend(c.customer_id for c in batch[:added])
+        print(f"{title:>12} {added:>10} {elapsed:>10.2f} {added / elapsed:>10.0f}")
+
+    with tempfile.TemporaryFile("w+", encoding="utf-8", newline="") as f:
+        t0 = time.perf_counter()
+        exported = repository.bulk_export(f) or 0
+        elapsed = time.perf_counter() - t0
+        print(f"{'COPY TO':>12} {exported:>10} {elapsed:>10.2f} {exported / elapsed:>10.0f}")
+
+    repository.delete_many(created)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("Использование: python 2.5.py <DSN тестовой БД>")
+        sys.exit(1)
+    bench_bulk_insert({"dsn": sys.argv[1]})
@@ -4,9 +4,12 @@
 """
 
 import json
-from typing import List, Optional, Dict, Any, Callable
+from typing import List, Optional, Dict, Any, Callable, Sequence, Tuple
 from entities import Customer, ShortCustomer, ValidationError
 from repository_base import CustomerRepBase, SortField
+from pagination import keyset_page, PageResult, query_page
+from customer_list import CustomerList, CustomerSnapshot
+from deferred_loading import DeferredLoadMixin, needs_data
 
 
 class LegacyProductService:
@@ -52,6 +55,23 @@ class LegacyProductService:
         self._products.append(product_info)
         return new_id
 
+    def add_product_entries(self, products_info: List[Dict[str, Any]]) -> List[int]:
+        """
+        Добавить несколько записей о товарах.
+
+        Args:
+            products_info: информация о товарах
+
+        Returns:
+            ID новых товаров
+        """
+        max_id = max([p["product_id"] for p in self._products], default=100)
+        new_ids = list(range(max_id + 1, max_id + 1 + len(products_info)))
+        for product_info, new_id in zip(products_info, new_ids):
+            product_info["product_id"] = new_id
+            self._products.append(product_info)
+        return new_ids
+
     def total_entries(self) -> int:
         """
         Получить общее количество товаров.
@@ -135,18 +155,24 @@ class ProductShort:
         return f"ID: {self.product_id}, Товар: {self.name}, Цена: {self.price}"
 
 
-class ProductRepositoryAdapter(CustomerRepBase):
+class ProductRepositoryAdapter(DeferredLoadMixin, CustomerRepBase):
     """Адаптер для интеграции LegacyProductService в иерархию репозиториев."""
 
-    def __init__(self):
-        """Инициализация адаптера."""
+    def __init__(self, load: str = "eager"):
+        """
+        Инициализация адаптера.
+
+        Args:
+            load: режим загрузки: "eager" — в конструкторе, "lazy" — при первом
+                обращении, "background" — в фоновом потоке
+        """
         self._legacy_service = LegacyProductService()
-        self._data_list: List[Customer] = []  # Используем Customer для совместимости
-        self._load_from_service()
+        self._data_list = CustomerList()  # Используем Customer для совместимости
+        self._start_loading(load, self._load_from_service)
 
     def _load_from_service(self) -> None:
         """Загрузить данные из старого сервиса."""
-        self._data_list = []
+        self._data_list = CustomerList()
         for product_data in self._legacy_service.get_all_products():
             try:
                 # Используем специальный телефон для товаров, который проходит валидацию
@@ -168,6 +194,7 @@ class ProductRepositoryAdapter(CustomerRepBase):
                 print(f"Ошибка валидации товара {product_data['name']}: {e}")
                 continue
 
+    @needs_data
     def read_from_file(self) -> None:
         """Чтение данных из сервиса."""
         self._load_from_service()
@@ -176,13 +203,15 @@ class ProductRepositoryAdapter(CustomerRepBase):
         """Для адаптера запись в файл не требуется."""
         pass
 
+    @needs_data
     def get_by_id(self, c_id: int) -> Optional[Customer]:
         """Получить товар по ID."""
-        for customer in self._data_list:
-            if customer.customer_id == c_id and hasattr(customer, "_is_product"):
-                return customer
+        customer = self._data_list.get(c_id)
+        if customer is not None and hasattr(customer, "_is_product"):
+            return customer
         return None
 
+    @needs_data
     def get_k_n_short_list(
         self,
         k: int,
@@ -192,28 +221,42 @@ class ProductRepositoryAdapter(CustomerRepBase):
         reverse: bool = False,
     ) -> List[ShortCustomer]:
         """Получить короткий список товаров."""
-        # Фильтруем только товары
-        product_data = [c for c in self._data_list if hasattr(c, "_is_product")]
-
-        # Применяем фильтр
-        if filter_func:
-            product_data = [c for c in product_data if filter_func(c)]
+        return self.query(k, n, filter_func, sort_key, reverse).items
 
-        # Сортировка
-        if sort_key:
-            product_data.sort(key=sort_key, reverse=reverse)
-        else:
-            # Сортировка по ID по умолчанию
-            product_data.sort(key=lambda x: x.customer_id)
+    @needs_data
+    def query(
+        self,
+        k: int,
+        n: int,
+        filter_func: Optional[Callable[[Customer], bool]] = None,
+        sort_key: Optional[Callable[[Customer], Any]] = None,
+        reverse: bool = False,
+    ) -> PageResult:
+        """Получить страницу товаров вместе с их общим количеством."""
+        # Фильтруем только товары, сортировка по ID по умолчанию
+        product_data = [c for c in self._data_list if hasattr(c, "_is_product")]
+        result = query_page(product_data, k, n, filter_func, sort_key, reverse)
+        return result._replace(items=self._to_short_list(result.items))
 
-        # Пагинация
-        start = (k - 1) * n
-        end = start + n
-        paginated_data = product_data[start:end]
+    @needs_data
+    def get_page(
+        self,
+        n: int,
+        cursor: Optional[str] = None,
+        filter_func: Optional[Callable[[Customer], bool]] = None,
+        sort_field: SortField = SortField.CUSTOMER_ID,
+        reverse: bool = False,
+    ) -> Tuple[List[ShortCustomer], Optional[str]]:
+        """Получить страницу товаров по курсору."""
+        product_data = [c for c in self._data_list if hasattr(c, "_is_product")]
+        page, next_cursor = keyset_page(product_data, n, cursor, filter_func, sort_field, reverse)
+        return self._to_short_list(page), next_cursor
 
-        # Преобразуем в ShortCustomer с информацией о товарах
+    @staticmethod
+    def _to_short_list(products: List[Customer]) -> List[ShortCustomer]:
+        """Преобразовать в ShortCustomer с информацией о товарах."""
         result = []
-        for customer in paginated_data:
+        for customer in products:
             price = getattr(customer, "_price", 0.0)
             # Используем специальный телефон для отображения
             phone = "Товар"
@@ -226,6 +269,7 @@ class ProductRepositoryAdapter(CustomerRepBase):
             )
         return result
 
+    @needs_data
     def add(self, new_customer: Customer) -> bool:
         """Добавить новый товар."""
         # Проверяем необходимые атрибуты
@@ -251,34 +295,73 @@ class ProductRepositoryAdapter(CustomerRepBase):
         self._data_list.append(new_customer)
         return True
 
+    @needs_data
     def replace_by_id(self, c_id: int, new_customer: Customer) -> bool:
         """Заменить товар по ID."""
-        for i, customer in enumerate(self._data_list):
-            if customer.customer_id == c_id and hasattr(customer, "_is_product"):
-                if not hasattr(new_customer, "_price") or not hasattr(new_customer, "_has_delivery"):
-                    return False
-                new_customer.customer_id = c_id
-                new_customer._is_product = True
-                # Убедимся, что телефон валиден
-                if not hasattr(new_customer, "_product_phone"):
-                    new_customer.phone = "+70000000000"
-                    new_customer._product_phone = new_customer.phone
-                self._data_list[i] = new_customer
-                return True
-        return False
+        if self.get_by_id(c_id) is None:
+            return False
+        if not hasattr(new_customer, "_price") or not hasattr(new_customer, "_has_delivery"):
+            return False
+        new_customer.customer_id = c_id
+        new_customer._is_product = True
+        # Убедимся, что телефон валиден
+        if not hasattr(new_customer, "_product_phone"):
+            new_customer.phone = "+70000000000"
+            new_customer._product_phone = new_customer.phone
+        return self._data_list.replace(c_id, new_customer)
 
+    @needs_data
     def delete_by_id(self, c_id: int) -> bool:
-        """Удалить товар по ID."""
-        for i, customer in enumerate(self._data_list):
-            if customer.customer_id == c_id and hasattr(customer, "_is_product"):
-                del self._data_list[i]
-                # Также удалить из legacy service
-                self._legacy_service._products = [
-                    p for p in self._legacy_service._products if p["product_id"] != c_id
-                ]
-                return True
-        return False
+        """Удалить товар по ID (в списке остаётся надгробие)."""
+        if self.get_by_id(c_id) is None:
+            return False
+        self._data_list.remove(c_id)
+        # Также удалить из legacy service
+        self._legacy_service._products = [
+            p for p in self._legacy_service._products if p["product_id"] != c_id
+        ]
+        return True
 
+    @needs_data
+    def add_many(self, customers: List[Customer]) -> int:
+        """Добавить несколько товаров (ID выделяются сервисом одним блоком)."""
+        customers = list(customers)
+        for new_customer in customers:
+            if not hasattr(new_customer, "_price") or not hasattr(new_customer, "_has_delivery"):
+                raise ValueError("Для добавления товара нужны атрибуты _price и _has_delivery")
+
+        products_info = [
+            {"name": c.name, "price": c._price, "has_delivery": c._has_delivery}
+            for c in customers
+        ]
+        new_ids = self._legacy_service.add_product_entries(products_info)
+
+        for new_customer, new_id in zip(customers, new_ids):
+            new_customer.customer_id = new_id
+            new_customer._is_product = True
+            if not hasattr(new_customer, "_product_phone"):
+                new_customer.phone = "+70000000000"
+                new_customer._product_phone = new_customer.phone
+        self._data_list.extend(customers)
+        return len(customers)
+
+    @needs_data
+    def replace_many(self, replacements: Dict[int, Customer]) -> int:
+        """Заменить несколько товаров."""
+        return sum(self.replace_by_id(c_id, c) for c_id, c in replacements.items())
+
+    @needs_data
+    def delete_many(self, ids: List[int]) -> int:
+        """Удалить несколько товаров за один проход по сервису."""
+        deleted = {c_id for c_id in set(ids) if self.get_by_id(c_id) is not None}
+        if deleted:
+            self._data_list.remove_many(deleted)
+            self._legacy_service._products = [
+                p for p in self._legacy_service._products if p["product_id"] not in deleted
+            ]
+        return len(deleted)
+
+    @needs_data
     def sort_by_field(self, field: SortField, reverse: bool = False) -> None:
         """Сортировка товаров по полю."""
         # В этом адаптере сортировка по полям Customer
@@ -292,6 +375,7 @@ class ProductRepositoryAdapter(CustomerRepBase):
 
         self._data_list.sort(key=field_mapping[field], reverse=reverse)
 
+    @needs_data
     def get_count(
         self, filter_func: Optional[Callable[[Customer], bool]] = None
     ) -> int:
@@ -301,6 +385,16 @@ class ProductRepositoryAdapter(CustomerRepBase):
             return len([c for c in product_data if filter_func(c)])
         return len(product_data)
 
-    def get_all(self) -> List[Customer]:
-        """Получить все товары."""
-        return [c for c in self._data_list if hasattr(c, "_is_product")]
\ No newline at end of file
+    @needs_data
+    def get_all(self) -> Sequence[Customer]:
+        """Получить все товары (неизменяемый снимок, без копирования)."""
+        return self.snapshot()
+
+    @needs_data
+    def snapshot(self) -> CustomerSnapshot:
+        """
+        Получить неизменяемый снимок товаров за O(1).
+        Все элементы списка — товары: загрузка, add и replace_by_id
+        выставляют им признак _is_product.
+        """
+        return self._data_list.snapshot()
\ No newline at end of file
@@ -3,8 +3,10 @@
 Реализует пункт 7.
 """
 
-from typing import List, Optional, Dict, Any, Callable
-from repository_base import CustomerRepBase
+from typing import List, Optional, Dict, Sequence, Tuple
+from repository_base import CustomerRepBase, SortField
+from pagination import PageResult, SortKey
+from predicates import Filter, combine_filters
 from entities import Customer, ShortCustomer
 
 
@@ -36,13 +38,35 @@ class RepositoryDecorator(CustomerRepBase):
         self,
         k: int,
         n: int,
-        filter_func: Optional[Callable[[Customer], bool]] = None,
-        sort_key: Optional[Callable[[Customer], Any]] = None,
+        filter_func: Optional[Filter] = None,
+        sort_key: Optional[SortKey] = None,
         reverse: bool = False,
     ) -> List[ShortCustomer]:
         """Делегировать получение списка с пагинацией."""
         return self._repository.get_k_n_short_list(k, n, filter_func, sort_key, reverse)
 
+    def query(
+        self,
+        k: int,
+        n: int,
+        filter_func: Optional[Filter] = None,
+        sort_key: Optional[SortKey] = None,
+        reverse: bool = False,
+    ) -> PageResult:
+        """Делегировать получение страницы с общим количеством."""
+        return self._repository.query(k, n, filter_func, sort_key, reverse)
+
+    def get_page(
+        self,
+        n: int,
+        cursor: Optional[str] = None,
+        filter_func: Optional[Filter] = None,
+        sort_field: SortField = SortField.CUSTOMER_ID,
+        reverse: bool = False,
+    ) -> Tuple[List[ShortCustomer], Optional[str]]:
+        """Делегировать получение страницы по курсору."""
+        return self._repository.get_page(n, cursor, filter_func, sort_field, reverse)
+
     def sort_by_field(self, field, reverse: bool = False) -> None:
         """Делегировать сортировку по имени."""
         return self._repository.sort_by_field(field, reverse)
@@ -59,16 +83,32 @@ class RepositoryDecorator(CustomerRepBase):
         """Делегировать удаление по ID."""
         return self._repository.delete_by_id(c_id)
 
+    def add_many(self, customers: List[Customer]) -> int:
+        """Делегировать пакетное добавление."""
+        return self._repository.add_many(customers)
+
+    def replace_many(self, replacements: Dict[int, Customer]) -> int:
+        """Делегировать пакетную замену."""
+        return self._repository.replace_many(replacements)
+
+    def delete_many(self, ids: List[int]) -> int:
+        """Делегировать пакетное удаление."""
+        return self._repository.delete_many(ids)
+
     def get_count(
-        self, filter_func: Optional[Callable[[Customer], bool]] = None
+        self, filter_func: Optional[Filter] = None
     ) -> int:
         """Делегировать получение количества."""
         return self._repository.get_count(filter_func)
 
-    def get_all(self) -> List[Customer]:
-        """Делегировать получение всех клиентов."""
+    def get_all(self) -> Sequence[Customer]:
+        """Делегировать получение всех клиентов (снимок без копирования)."""
         return self._repository.get_all()
 
+    def snapshot(self) -> Sequence[Customer]:
+        """Делегировать получение неизменяемого снимка."""
+        return self._repository.snapshot()
+
 
 class DBDecoratorWithFilter(RepositoryDecorator):
     """
@@ -84,18 +124,18 @@ class DBDecoratorWithFilter(RepositoryDecorator):
             repository: декорируемый репозиторий
         """
         super().__init__(repository)
-        self._filter_functions: List[Callable[[Customer], bool]] = []
-        self._sort_key: Optional[Callable[[Customer], Any]] = None
+        self._filter_functions: List[Filter] = []
+        self._sort_key: Optional[SortKey] = None
         self._reverse = False
 
     def add_filter_function(
-        self, filter_func: Callable[[Customer], bool]
+        self, filter_func: Filter
     ) -> "DBDecoratorWithFilter":
         """
         Добавить функцию-фильтр.
 
         Args:
-            filter_func: функция, принимающая Customer и возвращающая bool
+            filter_func: условие Predicate или функция, принимающая Customer и возвращающая bool
 
         Returns:
             self для цепочки вызовов
@@ -105,14 +145,14 @@ class DBDecoratorWithFilter(RepositoryDecorator):
 
     def set_sorting(
         self,
-        sort_key: Optional[Callable[[Customer], Any]] = None,
+        sort_key: Optional[SortKey] = None,
         reverse: bool = False,
     ) -> "DBDecoratorWithFilter":
         """
         Установить сортировку.
 
         Args:
-            sort_key: функция для извлечения ключа сортировки
+            sort_key: поле SortField или функция для извлечения ключа сортировки
             reverse: обратный порядок сортировки
 
         Returns:
@@ -136,8 +176,8 @@ class DBDecoratorWithFilter(RepositoryDecorator):
         self,
         k: int,
         n: int,
-        filter_func: Optional[Callable[[Customer], bool]] = None,
-        sort_key: Optional[Callable[[Customer], Any]] = None,
+        filter_func: Optional[Filter] = None,
+        sort_key: Optional[SortKey] = None,
         reverse: bool = False,
     ) -> List[ShortCustomer]:
         """
@@ -164,8 +204,59 @@ class DBDecoratorWithFilter(RepositoryDecorator):
             k, n, combined_filter, actual_sort_key, actual_reverse
         )
 
+    def query(
+        self,
+        k: int,
+        n: int,
+        filter_func: Optional[Filter] = None,
+        sort_key: Optional[SortKey] = None,
+        reverse: bool = False,
+    ) -> PageResult:
+        """
+        Получить отфильтрованную страницу, общее количество и число страниц.
+        Фильтры применяются один раз, отдельный вызов get_count не нужен.
+
+        Args:
+            k: номер страницы
+            n: количество элементов на странице
+            filter_func: дополнительная функция фильтрации
+            sort_key: дополнительная функции сортировки
+            reverse: обратный порядок сортировки
+
+        Returns:
+            PageResult со списком ShortCustomer
+        """
+        combined_filter = self._combine_filters(filter_func)
+        actual_sort_key = sort_key if sort_key is not None else self._sort_key
+        actual_reverse = reverse if sort_key is not None else self._reverse
+        return self._repository.query(k, n, combined_filter, actual_sort_key, actual_reverse)
+
+    def get_page(
+        self,
+        n: int,
+        cursor: Optional[str] = None,
+        filter_func: Optional[Filter] = None,
+        sort_field: SortField = SortField.CUSTOMER_ID,
+        reverse: bool = False,
+    ) -> Tuple[List[ShortCustomer], Optional[str]]:
+        """
+        Получить страницу по курсору с учетом фильтров декоратора.
+
+        Args:
+            n: количество элементов на странице
+            cursor: курсор предыдущей страницы
+            filter_func: дополнительная функция фильтрации
+            sort_field: поле сортировки
+            reverse: обратный порядок сортировки
+
+        Returns:
+            Страница и курсор следующей страницы
+        """
+        combined_filter = self._combine_filters(filter_func)
+        return self._repository.get_page(n, cursor, combined_filter, sort_field, reverse)
+
     def get_count(
-        self, filter_func: Optional[Callable[[Customer], bool]] = None
+        self, filter_func: Optional[Filter] = None
     ) -> int:
         """
         Получить количество элементов с учетом фильтров.
@@ -179,23 +270,10 @@ class DBDecoratorWithFilter(RepositoryDecorator):
         combined_filter = self._combine_filters(filter_func)
         return self._repository.get_count(combined_filter)
 
-    def _combine_filters(
-        self, additional_filter: Optional[Callable[[Customer], bool]]
-    ) -> Optional[Callable[[Customer], bool]]:
-        """Объединить фильтры."""
-        if not self._filter_functions and additional_filter is None:
-            return None
-
-        def combined_filter(customer: Customer) -> bool:
-            # Применяем все фильтры декоратора
-            for filter_func in self._filter_functions:
-                if not filter_func(customer):
-                    return False
-
-            # Применяем дополнительный фильтр
-            if additional_filter is not None and not additional_filter(customer):
-                return False
-
-            return True
-
-        return combined_filter
\ No newline at end of file
+    def _combine_filters(self, additional_filter: Optional[Filter]) -> Optional[Filter]:
+        """
+        Объединить фильтры.
+        Если все фильтры — условия Predicate, репозиторий получает одно
+        условие Predicate (БД выполнит его в WHERE).
+        """
+        return combine_filters(self._filter_functions + [additional_filter])
\ No newline at end of file
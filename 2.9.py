@@ -0,0 +1,292 @@
+"""
+Read-only репозиторий клиентов поверх файла JSON Lines, отображённого в память.
+Предназначен для отчётных узлов: записи декодируются только при обращении к ним.
+"""
+
+import json
+import mmap
+import os
+import re
+import struct
+from array import array
+from typing import List, Optional, Dict, Callable, Tuple
+from entities import Customer, ShortCustomer, ValidationError
+from repository_base import CustomerRepBase, SortField
+from pagination import keyset_page, select_page, PageResult, page_count, query_page, resolve_sort_key, SortKey
+
+
+class CustomerRepMmap(CustomerRepBase):
+    """
+    Репозиторий только для чтения.
+    Файл отображается в память, а рядом хранится индекс ID -> смещение строки
+    (<файл>.idx), поэтому get_by_id и пагинация декодируют только нужные записи.
+    """
+
+    _ID_PATTERN = re.compile(rb'"customer_id"\s*:\s*(\d+)')
+    _INDEX_HEADER = struct.Struct("<4sqqq")
+    _INDEX_MAGIC = b"CIX1"
+
+    def __init__(self, file_path: str):
+        """
+        Инициализация репозитория.
+
+        Args:
+            file_path: путь к файлу JSON Lines
+        """
+        self._file_path = file_path
+        self._index_path = file_path + ".idx"
+        self._file = None
+        self._mmap: Optional[mmap.mmap] = None
+        self._ids = array("q")
+        self._offsets = array("q")
+        self._positions: Dict[int, int] = {}
+        self._order_by_id = array("q")
+        self._order = array("q")
+        self.read_from_file()
+
+    def read_from_file(self) -> None:
+        """Отобразить файл в память и загрузить (или построить) индекс."""
+        self.close()
+        self._ids = array("q")
+        self._offsets = array("q")
+        if not os.path.exists(self._file_path) or os.path.getsize(self._file_path) == 0:
+            self._build_orders()
+            return
+
+        self._file = open(self._file_path, "rb")
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        if not self._load_index():
+            self._build_index()
+            self._save_index()
+        self._build_orders()
+
+    def write_to_file(self) -> None:
+        """Репозиторий только для чтения: запись не выполняется."""
+        pass
+
+    def close(self) -> None:
+        """Освободить отображение файла."""
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    # Индекс ID -> смещение
+
+    def _source_stamp(self) -> tuple:
+        """Размер и время изменения исходного файла для проверки индекса."""
+        stat = os.stat(self._file_path)
+        return stat.st_size, stat.st_mtime_ns
+
+    def _build_index(self) -> None:
+        """Построить индекс одним проходом по файлу без декодирования JSON."""
+        mm = self._mmap
+        size = len(mm)
+        pos = 0
+        while pos < size:
+            end = mm.find(b"\n", pos)
+            if end == -1:
+                end = size
+            match = self._ID_PATTERN.search(mm, pos, end)
+            if match:
+                self._ids.append(int(match.group(1)))
+                self._offsets.append(pos)
+            pos = end + 1
+
+    def _load_index(self) -> bool:
+        """
+        Загрузить индекс из файла-спутника.
+
+        Returns:
+            True, если индекс актуален для текущей версии файла
+        """
+        if not os.path.exists(self._index_path):
+            return False
+        try:
+            with open(self._index_path, "rb") as f:
+                magic, size, mtime_ns, count = self._INDEX_HEADER.unpack(
+                    f.read(self._INDEX_HEADER.size)
+                )
+                if magic != self._INDEX_MAGIC or (size, mtime_ns) != self._source_stamp():
+                    return False
+                self._ids.fromfile(f, count)
+                self._offsets.fromfile(f, count)
+            return True
+        except (OSError, EOFError, struct.error):
+            self._ids = array("q")
+            self._offsets = array("q")
+            return False
+
+    def _save_index(self) -> None:
+        """Сохранить индекс рядом с файлом данных."""
+        try:
+            size, mtime_ns = self._source_stamp()
+            with open(self._index_path, "wb") as f:
+                f.write(self._INDEX_HEADER.pack(self._INDEX_MAGIC, size, mtime_ns, len(self._ids)))
+                self._ids.tofile(f)
+                self._offsets.tofile(f)
+        except OSError as e:
+            print(f"Не удалось сохранить индекс: {e}")
+
+    def _build_orders(self) -> None:
+        """Построить словарь позиций и порядок записей по ID."""
+        ids = self._ids
+        self._positions = {c_id: pos for pos, c_id in enumerate(ids)}
+        if all(ids[i] < ids[i + 1] for i in range(len(ids) - 1)):
+            self._order_by_id = array("q", range(len(ids)))
+        else:
+            self._order_by_id = array("q", sorted(range(len(ids)), key=ids.__getitem__))
+        self._order = array("q", range(len(ids)))
+
+    # Декодирование записей
+
+    def _decode(self, pos: int) -> Optional[Customer]:
+        """Декодировать одну запись по её позиции в индексе."""
+        start = self._offsets[pos]
+        end = self._mmap.find(b"\n", start)
+        if end == -1:
+            end = len(self._mmap)
+        row = json.loads(self._mmap[start:end])
+        try:
+            return Customer(
+                customer_id=row["customer_id"],
+                name=row["name"],
+                address=row["address"],
+                phone=row["phone"],
+                contact_person=row["contact_person"],
+            )
+        except ValidationError as e:
+            print(f"Ошибка валидации данных: {e}")
+            return None
+
+    def _decode_many(self, positions) -> List[Customer]:
+        """Декодировать записи по списку позиций, пропуская невалидные."""
+        result = []
+        for pos in positions:
+            customer = self._decode(pos)
+            if customer is not None:
+                result.append(customer)
+        return result
+
+    # Чтение
+
+    def get_by_id(self, c_id: int) -> Optional[Customer]:
+        """Получить клиента по ID, декодировав только одну запись."""
+        pos = self._positions.get(c_id)
+        return None if pos is None else self._decode(pos)
+
+    def get_k_n_short_list(
+        self,
+        k: int,
+        n: int,
+        filter_func: Optional[Callable[[Customer], bool]] = None,
+        sort_key: Optional[SortKey] = None,
+        reverse: bool = False,
+    ) -> List[ShortCustomer]:
+        """
+        Получить короткий список клиентов с пагинацией.
+        Без фильтра и сортировки декодируются только записи страницы.
+        """
+        start = (k - 1) * n
+        end = start + n
+
+        if filter_func is None and sort_key is None:
+            order = self._order_by_id[::-1] if reverse else self._order_by_id
+            page = self._decode_many(order[start:end])
+        else:
+            data = self._decode_many(self._order_by_id)
+            if filter_func:
+                data = [c for c in data if filter_func(c)]
+            page = select_page(data, start, n, resolve_sort_key(sort_key) or (lambda x: x.customer_id), reverse)
+
+        return [ShortCustomer(c.customer_id, c.name, c.phone) for c in page]
+
+    def query(
+        self,
+        k: int,
+        n: int,
+        filter_func: Optional[Callable[[Customer], bool]] = None,
+        sort_key: Optional[SortKey] = None,
+        reverse: bool = False,
+    ) -> PageResult:
+        """Получить страницу вместе с общим количеством подходящих клиентов."""
+        if filter_func is None and sort_key is None:
+            total = len(self._ids)
+            return PageResult(self.get_k_n_short_list(k, n, reverse=reverse), total, page_count(total, n))
+        data = self._decode_many(self._order_by_id)
+        result = query_page(data, k, n, filter_func, sort_key or (lambda x: x.customer_id), reverse)
+        return result._replace(items=[ShortCustomer(c.customer_id, c.name, c.phone) for c in result.items])
+
+    def get_page(
+        self,
+        n: int,
+        cursor: Optional[str] = None,
+        filter_func: Optional[Callable[[Customer], bool]] = None,
+        sort_field: SortField = SortField.CUSTOMER_ID,
+        reverse: bool = False,
+    ) -> Tuple[List[ShortCustomer], Optional[str]]:
+        """Получить страницу по курсору (декодирует весь файл)."""
+        data = self._decode_many(self._order_by_id)
+        page, next_cursor = keyset_page(data, n, cursor, filter_func, sort_field, reverse)
+        return [ShortCustomer(c.customer_id, c.name, c.phone) for c in page], next_cursor
+
+    def sort_by_field(self, field: SortField, reverse: bool = False) -> None:
+        """Изменить порядок выдачи get_all (сам файл не меняется)."""
+        field_mapping = {
+            SortField.CUSTOMER_ID: lambda x: x.customer_id,
+            SortField.NAME: lambda x: x.name.lower(),
+            SortField.ADDRESS: lambda x: x.address.lower(),
+            SortField.PHONE: lambda x: x.phone,
+            SortField.CONTACT_PERSON: lambda x: x.contact_person.lower(),
+        }
+
+        if field not in field_mapping:
+            raise ValueError(f"Поле {field} недоступно для сортировки")
+
+        key = field_mapping[field]
+        keys = {}
+        for pos in range(len(self._ids)):
+            customer = self._decode(pos)
+            if customer is not None:
+                keys[pos] = key(customer)
+        self._order = array("q", sorted(keys, key=keys.__getitem__, reverse=reverse))
+
+    def get_count(
+        self, filter_func: Optional[Callable[[Customer], bool]] = None
+    ) -> int:
+        """Получить количество клиентов."""
+        if filter_func is None:
+            return len(self._ids)
+        return len([c for c in self._decode_many(self._order_by_id) if filter_func(c)])
+
+    def get_all(self) -> List[Customer]:
+        """Получить всех клиентов (декодирует весь файл)."""
+        return self._decode_many(self._order)
+
+    # Изменение данных не поддерживается
+
+    def add(self, new_customer: Customer) -> bool:
+        """Добавление недоступно."""
+        raise ValueError("Репозиторий доступен только для чтения")
+
+    def replace_by_id(self, c_id: int, new_customer: Customer) -> bool:
+        """Замена недоступна."""
+        raise ValueError("Репозиторий доступен только для чтения")
+
+    def delete_by_id(self, c_id: int) -> bool:
+        """Удаление недоступно."""
+        raise ValueError("Репозиторий доступен только для чтения")
+
+    def add_many(self, customers: List[Customer]) -> int:
+        """Пакетное добавление недоступно."""
+        raise ValueError("Репозиторий доступен только для чтения")
+
+    def replace_many(self, replacements: Dict[int, Customer]) -> int:
+        """Пакетная замена недоступна."""
+        raise ValueError("Репозиторий доступен только для чтения")
+
+    def delete_many(self, ids: List[int]) -> int:
+        """Пакетное удаление недоступно."""
+        raise ValueError("Репозиторий доступен только для чтения")
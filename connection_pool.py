@@ -0,0 +1,263 @@
+"""
+Пул подключений к PostgreSQL.
+Подключения создаются заранее (min_size) или по требованию (до max_size)
+и переиспользуются между запросами, поэтому установка TCP-соединения,
+аутентификация и запуск серверного процесса происходят один раз на подключение.
+"""
+
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Callable, Deque, Dict, Iterator, NamedTuple, Optional, Tuple
+
+import psycopg2
+from psycopg2.extensions import TRANSACTION_STATUS_IDLE
+from psycopg2.pool import PoolError
+
+
+class PoolStats(NamedTuple):
+    """Метрики пула с момента создания или последнего reset_stats."""
+
+    size: int
+    idle: int
+    in_use: int
+    max_size: int
+    peak_in_use: int
+    acquisitions: int
+    timeouts: int
+    avg_wait: float
+    max_wait: float
+    utilization: float
+
+
+class ConnectionPool:
+    """
+    Потокобезопасный пул подключений.
+    Если все max_size подключений заняты, getconn ждёт освобождения не дольше
+    timeout секунд. Подключение, простоявшее дольше health_check_interval,
+    перед выдачей проверяется запросом SELECT 1; закрытые и сломанные
+    подключения отбрасываются и заменяются новыми.
+    """
+
+    def __init__(
+        self,
+        db_config: Dict[str, Any],
+        min_size: int = 1,
+        max_size: int = 10,
+        timeout: float = 30.0,
+        health_check_interval: float = 30.0,
+        connect: Optional[Callable[[], Any]] = None,
+    ):
+        """
+        Инициализация пула.
+
+        Args:
+            db_config: параметры psycopg2.connect
+            min_size: число подключений, открываемых сразу
+            max_size: наибольшее число открытых подключений
+            timeout: наибольшее время ожидания свободного подключения, с
+            health_check_interval: после какого простоя подключение проверяется, с
+            connect: функция создания подключения (по умолчанию psycopg2.connect)
+        """
+        if not 0 <= min_size <= max_size or max_size < 1:
+            raise ValueError("Размеры пула должны удовлетворять 0 <= min_size <= max_size, max_size >= 1")
+        self._connect = connect or (lambda: psycopg2.connect(**db_config))
+        self._max_size = max_size
+        self._timeout = timeout
+        self._health_check_interval = health_check_interval
+        self._cond = threading.Condition()
+        # Свободные подключения и время их возврата; выдаются с конца (LIFO),
+        # поэтому чаще используются недавно работавшие подключения
+        self._idle: Deque[Tuple[Any, float]] = deque()
+        self._size = 0
+        self._in_use = 0
+        self._closed = False
+        self.reset_stats()
+        for _ in range(min_size):
+            self._idle.append((self._connect(), time.monotonic()))
+            self._size += 1
+
+    def getconn(self, timeout: Optional[float] = None) -> Any:
+        """
+        Взять подключение из пула.
+
+        Args:
+            timeout: время ожидания, с (по умолчанию — заданное для пула)
+
+        Returns:
+            Подключение psycopg2
+
+        Raises:
+            PoolError: пул закрыт или свободное подключение не появилось за timeout
+        """
+        started = time.monotonic()
+        deadline = started + (self._timeout if timeout is None else timeout)
+        while True:
+            conn, last_used = self._reserve(deadline)
+            if conn is None:
+                try:
+                    conn = self._connect()
+                except Exception:
+                    self._release_slot()
+                    raise
+            elif not self._is_healthy(conn, last_used):
+                self._discard(conn)
+                self._release_slot()
+                continue
+            break
+
+        waited = time.monotonic() - started
+        with self._cond:
+            self._account()
+            self._in_use += 1
+            self._peak_in_use = max(self._peak_in_use, self._in_use)
+            self._acquisitions += 1
+            self._total_wait += waited
+            self._max_wait = max(self._max_wait, waited)
+        return conn
+
+    def putconn(self, conn: Any, discard: bool = False) -> None:
+        """
+        Вернуть подключение в пул.
+        Незавершённая транзакция откатывается; сломанное подключение закрывается.
+
+        Args:
+            conn: подключение, полученное из getconn
+            discard: закрыть подключение вместо возврата в пул
+        """
+        if not discard and not conn.closed and conn.get_transaction_status() != TRANSACTION_STATUS_IDLE:
+            try:
+                conn.rollback()
+            except psycopg2.Error:
+                discard = True
+        discard = discard or bool(conn.closed)
+        with self._cond:
+            self._account()
+            self._in_use -= 1
+            if discard or self._closed:
+                self._size -= 1
+            else:
+                self._idle.append((conn, time.monotonic()))
+            self._cond.notify()
+        if discard or self._closed:
+            self._discard(conn)
+
+    @contextmanager
+    def connection(self) -> Iterator[Any]:
+        """
+        Подключение на время блока with.
+        При успешном выходе транзакция фиксируется, при исключении откатывается;
+        подключение с ошибкой связи в пул не возвращается.
+        """
+        conn = self.getconn()
+        try:
+            yield conn
+            conn.commit()
+        except BaseException as e:
+            broken = isinstance(e, (psycopg2.OperationalError, psycopg2.InterfaceError))
+            if not broken and not conn.closed:
+                try:
+                    conn.rollback()
+                except psycopg2.Error:
+                    broken = True
+            self.putconn(conn, discard=broken)
+            raise
+        self.putconn(conn)
+
+    def stats(self) -> PoolStats:
+        """Текущий размер пула, время ожидания и средняя загрузка."""
+        with self._cond:
+            self._account()
+            elapsed = time.monotonic() - self._stats_started
+            capacity = self._max_size * elapsed
+            return PoolStats(
+                size=self._size,
+                idle=len(self._idle),
+                in_use=self._in_use,
+                max_size=self._max_size,
+                peak_in_use=self._peak_in_use,
+                acquisitions=self._acquisitions,
+                timeouts=self._timeouts,
+                avg_wait=self._total_wait / self._acquisitions if self._acquisitions else 0.0,
+                max_wait=self._max_wait,
+                utilization=self._busy_time / capacity if capacity > 0 else 0.0,
+            )
+
+    def reset_stats(self) -> None:
+        """Начать отсчёт метрик заново."""
+        with self._cond:
+            self._stats_started = self._last_change = time.monotonic()
+            self._busy_time = 0.0
+            self._peak_in_use = self._in_use
+            self._acquisitions = 0
+            self._timeouts = 0
+            self._total_wait = 0.0
+            self._max_wait = 0.0
+
+    def close(self) -> None:
+        """Закрыть свободные подключения; занятые закроются при возврате."""
+        with self._cond:
+            self._closed = True
+            idle, self._idle = list(self._idle), deque()
+            self._size -= len(idle)
+            self._cond.notify_all()
+        for conn, _ in idle:
+            self._discard(conn)
+
+    def _reserve(self, deadline: float) -> Tuple[Optional[Any], float]:
+        """
+        Занять свободное подключение или место под новое.
+
+        Returns:
+            (подключение, время возврата в пул) или (None, 0.0), если нужно
+            открыть новое подключение
+        """
+        with self._cond:
+            while True:
+                if self._closed:
+                    raise PoolError("Пул подключений закрыт")
+                if self._idle:
+                    return self._idle.pop()
+                if self._size < self._max_size:
+                    self._size += 1
+                    return None, 0.0
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self._timeouts += 1
+                    raise PoolError(f"Нет свободного подключения: заняты все {self._max_size}")
+                self._cond.wait(remaining)
+
+    def _release_slot(self) -> None:
+        """Освободить место подключения, которое не удалось открыть или проверить."""
+        with self._cond:
+            self._size -= 1
+            self._cond.notify()
+
+    def _is_healthy(self, conn: Any, last_used: float) -> bool:
+        """Проверить подключение, если оно закрыто или долго простаивало."""
+        if conn.closed:
+            return False
+        if time.monotonic() - last_used < self._health_check_interval:
+            return True
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute("SELECT 1")
+            conn.rollback()
+            return True
+        except psycopg2.Error:
+            return False
+
+    @staticmethod
+    def _discard(conn: Any) -> None:
+        """Закрыть подключение, не обращая внимания на ошибки связи."""
+        try:
+            conn.close()
+        except psycopg2.Error:
+            pass
+
+    def _account(self) -> None:
+        """Накопить время занятости подключений (вызывается под блокировкой)."""
+        now = time.monotonic()
+        self._busy_time += self._in_use * (now - self._last_change)
+        self._last_change = now
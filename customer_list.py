@@ -0,0 +1,205 @@
+"""
+Список клиентов в памяти с удалением через надгробия (tombstones).
+Удалённая запись помечается на месте, а список уплотняется целиком,
+только когда доля надгробий превышает порог.
+Снимки списка неизменяемы и разделяют с ним данные (копирование при записи).
+"""
+
+import threading
+from itertools import islice
+from typing import List, Optional, Dict, Any, Callable, Iterable, Iterator, Sequence
+from entities import Customer
+
+
+class CustomerSnapshot(Sequence):
+    """
+    Неизменяемое представление списка клиентов на момент создания.
+    Хранит ссылку на общий массив и его длину: добавления в конец
+    снимок не затрагивают, а замена и удаление копируют массив у владельца.
+    """
+
+    def __init__(self, items: List[Optional[Customer]], length: int, count: int, version: int):
+        """
+        Инициализация снимка.
+
+        Args:
+            items: массив элементов списка (с надгробиями)
+            length: число занятых позиций на момент снимка
+            count: число живых клиентов
+            version: версия списка
+        """
+        self._items = items
+        self._length = length
+        self._count = count
+        self._version = version
+        self._dense: Optional[List[Customer]] = None
+        self._by_id: Optional[Dict[int, Customer]] = None
+
+    @property
+    def version(self) -> int:
+        """Версия списка, с которой сделан снимок."""
+        return self._version
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __iter__(self) -> Iterator[Customer]:
+        items = islice(self._items, self._length)
+        if self._count == self._length:
+            return items
+        return (c for c in items if c is not None)
+
+    def __getitem__(self, index):
+        if self._count == self._length and not isinstance(index, slice):
+            # Без надгробий индексы снимка совпадают с позициями массива
+            return self._items[range(self._length)[index]]
+        if self._dense is None:
+            self._dense = list(self)
+        return self._dense[index]
+
+    def get(self, c_id: int) -> Optional[Customer]:
+        """Клиент по ID в этой версии (словарь строится при первом вызове)."""
+        if self._by_id is None:
+            self._by_id = {c.customer_id: c for c in self}
+        return self._by_id.get(c_id)
+
+
+class CustomerList:
+    """
+    Упорядоченный список клиентов с индексом ID -> позиция.
+    Удаление — O(1): элемент заменяется надгробием (None), позиции
+    остальных клиентов не сдвигаются. Чтение пропускает надгробия.
+    Изменения и снятие снимка выполняются под блокировкой, поэтому снимок
+    не может появиться между проверкой _shared и записью в общий массив.
+    """
+
+    COMPACT_RATIO = 0.25
+
+    def __init__(self, customers: Iterable[Customer] = (), compact_ratio: float = COMPACT_RATIO):
+        """
+        Инициализация списка.
+
+        Args:
+            customers: начальные клиенты
+            compact_ratio: доля надгробий, после которой список уплотняется
+        """
+        self._compact_ratio = compact_ratio
+        self._items: List[Optional[Customer]] = []
+        self._positions: Dict[int, int] = {}
+        self._dead = 0
+        self._version = 0
+        # Массив _items виден снимкам: перед изменением на месте его нужно скопировать
+        self._shared = False
+        self._lock = threading.Lock()
+        self.extend(customers)
+
+    def __len__(self) -> int:
+        return len(self._items) - self._dead
+
+    def __iter__(self) -> Iterator[Customer]:
+        if not self._dead:
+            return iter(self._items)
+        return (c for c in self._items if c is not None)
+
+    @property
+    def version(self) -> int:
+        """Номер версии; увеличивается при каждом изменении."""
+        return self._version
+
+    def snapshot(self) -> CustomerSnapshot:
+        """Неизменяемый снимок текущей версии за O(1)."""
+        with self._lock:
+            self._shared = True
+            return CustomerSnapshot(self._items, len(self._items), len(self), self._version)
+
+    def get(self, c_id: int) -> Optional[Customer]:
+        """Клиент по ID или None."""
+        pos = self._positions.get(c_id)
+        return None if pos is None else self._items[pos]
+
+    def append(self, customer: Customer) -> None:
+        """Добавить клиента в конец списка."""
+        with self._lock:
+            self._append(customer)
+
+    def extend(self, customers: Iterable[Customer]) -> None:
+        """Добавить клиентов в конец списка."""
+        with self._lock:
+            for customer in customers:
+                self._append(customer)
+
+    def replace(self, c_id: int, customer: Customer) -> bool:
+        """Заменить клиента на его месте в списке."""
+        with self._lock:
+            pos = self._positions.get(c_id)
+            if pos is None:
+                return False
+            self._before_write()
+            self._items[pos] = customer
+            return True
+
+    def remove(self, c_id: int) -> bool:
+        """Пометить клиента удалённым."""
+        with self._lock:
+            pos = self._positions.pop(c_id, None)
+            if pos is None:
+                return False
+            self._before_write()
+            self._items[pos] = None
+            self._dead += 1
+            self._maybe_compact()
+            return True
+
+    def remove_many(self, ids: Iterable[int]) -> int:
+        """Пометить удалёнными несколько клиентов; уплотнение — не более одного раза."""
+        removed = 0
+        with self._lock:
+            self._before_write()
+            for c_id in ids:
+                pos = self._positions.pop(c_id, None)
+                if pos is not None:
+                    self._items[pos] = None
+                    removed += 1
+            self._dead += removed
+            self._maybe_compact()
+        return removed
+
+    def sort(self, key: Callable[[Customer], Any], reverse: bool = False) -> None:
+        """Отсортировать живых клиентов (надгробия при этом убираются)."""
+        with self._lock:
+            self._items = sorted(self, key=key, reverse=reverse)
+            self._reindex()
+
+    def compact(self) -> None:
+        """Убрать надгробия и пересчитать позиции."""
+        with self._lock:
+            self._compact()
+
+    def _append(self, customer: Customer) -> None:
+        # Снимки ограничены своей длиной, поэтому массив не копируется
+        self._positions[customer.customer_id] = len(self._items)
+        self._items.append(customer)
+        self._version += 1
+
+    def _compact(self) -> None:
+        if self._dead:
+            self._items = [c for c in self._items if c is not None]
+            self._reindex()
+
+    def _maybe_compact(self) -> None:
+        if self._dead > len(self._items) * self._compact_ratio:
+            self._compact()
+
+    # Вызывается под блокировкой перед изменением массива на месте
+    def _before_write(self) -> None:
+        self._version += 1
+        if self._shared:
+            self._items = list(self._items)
+            self._shared = False
+
+    def _reindex(self) -> None:
+        # Вызывается после замены _items новым массивом
+        self._positions = {c.customer_id: pos for pos, c in enumerate(self._items)}
+        self._dead = 0
+        self._shared = False
+        self._version += 1
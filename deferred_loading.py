@@ -0,0 +1,83 @@
+"""
+Отложенная загрузка данных репозитория.
+Конструктор не читает данные: они загружаются при первом обращении
+(режим "lazy") или в фоновом потоке, которого дожидаются читатели ("background").
+"""
+
+import functools
+import threading
+from typing import Callable, Optional
+
+LOAD_MODES = ("eager", "lazy", "background")
+
+
+def needs_data(method: Callable) -> Callable:
+    """Декоратор метода репозитория: перед вызовом дождаться загрузки данных."""
+
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        if self._load_pending:
+            self._wait_loaded()
+        return method(self, *args, **kwargs)
+
+    return wrapper
+
+
+class DeferredLoadMixin:
+    """Примесь для репозиториев с режимами загрузки eager / lazy / background."""
+
+    _load_pending = False
+
+    def _start_loading(self, load: str, loader: Callable[[], None]) -> None:
+        """
+        Запустить загрузку в выбранном режиме.
+
+        Args:
+            load: режим загрузки ("eager", "lazy" или "background")
+            loader: функция, загружающая данные репозитория
+        """
+        if load not in LOAD_MODES:
+            raise ValueError(f"Неизвестный режим загрузки: {load}")
+        self._loader_func = loader
+        self._load_lock = threading.Lock()
+        self._loader: Optional[threading.Thread] = None
+        self._load_error: Optional[BaseException] = None
+        self._load_pending = load != "eager"
+        if load == "eager":
+            loader()
+        elif load == "background":
+            self._loader = threading.Thread(target=self._run_loader, daemon=True)
+            self._loader.start()
+
+    def _run_loader(self) -> None:
+        """Фоновая загрузка: ошибка сохраняется и передаётся ожидающему потоку."""
+        try:
+            self._loader_func()
+        except Exception as e:
+            self._load_error = e
+
+    def _wait_loaded(self) -> None:
+        """
+        Дождаться окончания загрузки (в режиме lazy — выполнить её).
+        Вызовы из самой загрузки проходят без ожидания. Если загрузка
+        завершилась ошибкой, она передаётся вызывающему, а данные считаются
+        незагруженными: следующее обращение повторит загрузку.
+        """
+        if self._loader is threading.current_thread():
+            return
+        with self._load_lock:
+            if not self._load_pending:
+                return
+            if self._loader is None:
+                self._loader = threading.current_thread()
+                try:
+                    self._loader_func()
+                finally:
+                    self._loader = None
+            else:
+                self._loader.join()
+                self._loader = None
+                error, self._load_error = self._load_error, None
+                if error is not None:
+                    raise error
+            self._load_pending = False
@@ -70,6 +70,9 @@ def validate_id(customer_id: int) -> int:
 class ShortCustomer:
     """Краткая версия клиента (только основные данные)."""
 
+    # Без __dict__ у каждого экземпляра: заметно меньше памяти на клиента
+    __slots__ = ("_customer_id", "_name", "_phone", "_contact_person")
+
     def __init__(self, customer_id: int, name: str, phone: str, contact_person: str):
         """
         Инициализация краткой версии клиента.
@@ -167,6 +170,8 @@ class ShortCustomer:
 class Customer(ShortCustomer):
     """Расширенный класс клиента с полной информацией."""
 
+    __slots__ = ("_address",)
+
     def __init__(
         self,
         customer_id: int = 0,
@@ -212,6 +217,21 @@ class Customer(ShortCustomer):
             contact_person=data_dict.get("contact_person", ""),
         )
 
+    @classmethod
+    def from_trusted_dict(cls, data_dict: Dict[str, Any]) -> "Customer":
+        """
+        Создать объект без валидации полей.
+        Только для данных, записанных самим репозиторием и прошедших
+        проверку контрольной суммы; иначе используйте from_dict.
+        """
+        customer = cls.__new__(cls)
+        customer._customer_id = data_dict["customer_id"]
+        customer._name = data_dict["name"]
+        customer._address = data_dict["address"]
+        customer._phone = data_dict["phone"]
+        customer._contact_person = data_dict["contact_person"]
+        return customer
+
     @classmethod
     def from_json(cls, json_string: str) -> "Customer":
         """Создать объект из JSON строки."""
@@ -1,5 +1,10 @@
+import base64
+import hashlib
+import json
+from bisect import bisect_left
 from enum import Enum
-from typing import List, Optional, Callable, Any, Dict
+from itertools import islice
+from typing import List, Optional, Callable, Any, Dict, Iterator, NamedTuple, Tuple
 
 from .customer import Customer, ShortCustomer, ValidationError
 from .observer import Observable, Observer
@@ -15,22 +20,316 @@ class SortField(Enum):
     CONTACT_PERSON = "contact_person"
 
 
+# Удалённые клиенты помечаются надгробиями (None); список или индекс
+# уплотняется, когда доля надгробий превышает этот порог
+COMPACT_RATIO = 0.25
+
+# Ключи сортировки: вычисляются один раз при добавлении клиента в индекс
+SORT_KEYS: Dict[SortField, Callable[[Customer], Any]] = {
+    SortField.CUSTOMER_ID: lambda x: x.customer_id,
+    SortField.NAME: lambda x: x.name.lower(),
+    SortField.ADDRESS: lambda x: x.address.lower(),
+    SortField.PHONE: lambda x: x.phone,
+    SortField.CONTACT_PERSON: lambda x: x.contact_person.lower(),
+}
+
+
+def _sort_field(sort_by: Optional[str]) -> Optional[SortField]:
+    """Поле сортировки по имени из запроса; пустое или неизвестное имя — без сортировки."""
+    try:
+        return SortField(sort_by) if sort_by else None
+    except ValueError:
+        return None
+
+
+class PageResult(NamedTuple):
+    """Страница, общее число подходящих клиентов и число страниц."""
+    items: List[ShortCustomer]
+    total: int
+    total_pages: int
+
+
+def encode_cursor(key: Any, customer_id: int) -> str:
+    """Курсор страницы: ключ сортировки и ID последнего клиента."""
+    raw = json.dumps([key, customer_id], ensure_ascii=False).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii")
+
+
+def decode_cursor(cursor: str) -> Tuple[Any, int]:
+    """Распаковать курсор, полученный из encode_cursor."""
+    try:
+        key, customer_id = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        return key, int(customer_id)
+    except (ValueError, TypeError) as e:
+        raise ValueError(f"Некорректный курсор: {cursor}") from e
+
+
+class SortIndex:
+    """
+    Отсортированный индекс клиентов по одному полю.
+    Удалённая запись остаётся на месте как надгробие (ключ, ID, None),
+    поэтому удаление не сдвигает остальные записи.
+    """
+
+    def __init__(self, key_func: Callable[[Customer], Any], customers: List[Customer]):
+        """
+        Построение индекса.
+
+        Args:
+            key_func: функция ключа сортировки
+            customers: клиенты для индексации
+        """
+        self._key_func = key_func
+        # Записи (ключ, ID, клиент): пара (ключ, ID) уникальна,
+        # поэтому сами объекты Customer никогда не сравниваются
+        self._entries = sorted((key_func(c), c.customer_id, c) for c in customers)
+        self._dead = 0
+
+    def __len__(self) -> int:
+        return len(self._entries) - self._dead
+
+    def insert(self, customer: Customer) -> None:
+        """Добавить клиента, сохраняя порядок (поиск места за O(log n))."""
+        entry = (self._key_func(customer), customer.customer_id, customer)
+        i = bisect_left(self._entries, entry[:2])
+        if i < len(self._entries) and self._entries[i][:2] == entry[:2]:
+            # На этом месте надгробие того же клиента с тем же ключом
+            self._entries[i] = entry
+            self._dead -= 1
+        else:
+            self._entries.insert(i, entry)
+
+    def remove(self, customer: Customer) -> None:
+        """Пометить клиента удалённым; ключ должен соответствовать проиндексированным значениям."""
+        probe = (self._key_func(customer), customer.customer_id)
+        i = bisect_left(self._entries, probe)
+        if i < len(self._entries) and self._entries[i][:2] == probe and self._entries[i][2] is not None:
+            self._entries[i] = probe + (None,)
+            self._dead += 1
+            if self._dead > len(self._entries) * COMPACT_RATIO:
+                self._entries = [entry for entry in self._entries if entry[2] is not None]
+                self._dead = 0
+
+    def find(self, key: Any) -> Optional[Customer]:
+        """Найти клиента по точному значению ключа (для индекса по ID)."""
+        i = bisect_left(self._entries, (key,))
+        if i < len(self._entries) and self._entries[i][0] == key:
+            return self._entries[i][2]
+        return None
+
+    def last(self) -> Optional[Customer]:
+        """Клиент с наибольшим ключом."""
+        return next(self.iter_customers(reverse=True), None)
+
+    def iter_customers(self, reverse: bool = False) -> Iterator[Customer]:
+        """Клиенты в порядке индекса."""
+        entries = reversed(self._entries) if reverse else self._entries
+        return (entry[2] for entry in entries if entry[2] is not None)
+
+    def iter_entries(self, after: Optional[Tuple[Any, int]] = None,
+                     reverse: bool = False) -> Iterator[Tuple[Any, int, Customer]]:
+        """Записи (ключ, ID, клиент) строго после позиции after в заданном направлении."""
+        entries = self._entries
+        size = len(entries)
+        if after is None:
+            i = size if reverse else 0
+        else:
+            i = bisect_left(entries, after)
+            if not reverse and i < size and entries[i][:2] == after:
+                i += 1
+        positions = range(i - 1, -1, -1) if reverse else range(i, size)
+        return (entries[j] for j in positions if entries[j][2] is not None)
+
+    def page(self, start: int, count: int, reverse: bool = False) -> List[Customer]:
+        """Срез клиентов в порядке индекса (без надгробий — без полного обхода)."""
+        if self._dead:
+            return list(islice(self.iter_customers(reverse), start, start + count))
+        if reverse:
+            size = len(self._entries)
+            entries = self._entries[max(size - start - count, 0):max(size - start, 0)][::-1]
+        else:
+            entries = self._entries[start:start + count]
+        return [entry[2] for entry in entries]
+
+
 class CustomerRepository(Observable):
     """Репозиторий клиентов с паттерном Наблюдатель."""
 
+    def __init__(self, file_path: str = "customers.json"):
+        """
+        Инициализация репозитория.
+
+        Args:
+            file_path: путь к JSON-файлу с клиентами
+        """
+        super().__init__()
+        self._file_path = file_path
+        # Клиенты в порядке файла; удалённые заменяются надгробиями (None)
+        self._customers: List[Optional[Customer]] = []
+        self._positions: Dict[int, int] = {}
+        self._dead = 0
+        self._load_data()
+
+    def _checksum_path(self) -> str:
+        """Файл с SHA-256 данных, записанных самим репозиторием."""
+        return self._file_path + ".sha256"
+
+    def _read_checksum(self) -> Optional[str]:
+        """Сохранённая контрольная сумма или None."""
+        try:
+            with open(self._checksum_path(), "r", encoding="utf-8") as f:
+                return f.read().strip()
+        except OSError:
+            return None
+
+    def _write_checksum(self, digest: str) -> None:
+        """Сохранить контрольную сумму файла данных."""
+        try:
+            with open(self._checksum_path(), "w", encoding="utf-8") as f:
+                f.write(digest)
+        except OSError as e:
+            print(f"Не удалось сохранить контрольную сумму: {e}")
+
+    def _load_data(self) -> None:
+        """
+        Загрузить клиентов из файла.
+        Если хеш файла совпадает с сохранённым при записи, клиенты создаются
+        через Customer.from_trusted_dict без регулярных выражений валидации;
+        иначе каждая запись проверяется, а некорректные пропускаются.
+        """
+        self._set_customers([])
+        try:
+            with open(self._file_path, "rb") as f:
+                raw = f.read()
+        except FileNotFoundError:
+            return
+        digest = hashlib.sha256(raw).hexdigest()
+        items = json.loads(raw) if raw.strip() else []
+
+        if self._read_checksum() == digest:
+            self._set_customers([Customer.from_trusted_dict(item) for item in items])
+            return
+
+        customers = []
+        for item in items:
+            try:
+                customers.append(Customer.from_dict(item))
+            except ValidationError as e:
+                print(f"Пропущена некорректная запись: {e}")
+        self._set_customers(customers)
+        # Файл полностью прошёл валидацию: следующая загрузка будет быстрой
+        if len(customers) == len(items):
+            self._write_checksum(digest)
+
+    def _save_data(self) -> None:
+        """Записать клиентов в файл; хеш считается по тем же байтам, без перечитывания."""
+        raw = json.dumps(
+            [c.to_dict() for c in self._live()], ensure_ascii=False, indent=2
+        ).encode("utf-8")
+        with open(self._file_path, "wb") as f:
+            f.write(raw)
+        self._write_checksum(hashlib.sha256(raw).hexdigest())
+
+    def _set_customers(self, customers: List[Customer]) -> None:
+        """Заменить список клиентов; индексы сортировки строятся заново."""
+        self._reorder(customers)
+        self._sort_indexes: Dict[SortField, SortIndex] = {}
+
+    def _reorder(self, customers: List[Customer]) -> None:
+        """Заменить список теми же живыми клиентами в другом порядке (индексы остаются верными)."""
+        self._customers = customers
+        self._positions = {c.customer_id: pos for pos, c in enumerate(customers)}
+        self._dead = 0
+
+    def _compact(self) -> None:
+        """Убрать надгробия из списка клиентов."""
+        self._reorder(list(self._live()))
+
+    def _live(self) -> Iterator[Customer]:
+        """Клиенты в порядке списка без надгробий."""
+        if not self._dead:
+            return iter(self._customers)
+        return (c for c in self._customers if c is not None)
+
+    def _list_page(self, start: int, count: int) -> List[Customer]:
+        """Срез клиентов в порядке списка (без надгробий — без полного обхода)."""
+        if not self._dead:
+            return self._customers[start:start + count]
+        return list(islice(self._live(), start, start + count))
+
+    def _sort_index(self, field: SortField) -> SortIndex:
+        """Индекс по полю (строится при первом обращении)."""
+        if field not in self._sort_indexes:
+            self._sort_indexes[field] = SortIndex(SORT_KEYS[field], self._live())
+        return self._sort_indexes[field]
+
+    def _index_insert(self, customer: Customer) -> None:
+        """Добавить клиента во все построенные индексы."""
+        for index in self._sort_indexes.values():
+            index.insert(customer)
+
+    def _index_remove(self, customer: Customer) -> None:
+        """Удалить клиента из всех построенных индексов."""
+        for index in self._sort_indexes.values():
+            index.remove(customer)
+
+    def get_by_id(self, customer_id: int) -> Optional[Customer]:
+        """Получить клиента по ID (O(1))."""
+        pos = self._positions.get(customer_id)
+        return None if pos is None else self._customers[pos]
+
+    def add(self, customer_data: Dict[str, Any]) -> bool:
+        """Добавить клиента; ID = максимальный ID + 1."""
+        last = self._sort_index(SortField.CUSTOMER_ID).last()
+        new_id = last.customer_id + 1 if last else 1
+        customer = Customer.from_dict({**customer_data, "customer_id": new_id})
+        self._index_insert(customer)
+        self._positions[new_id] = len(self._customers)
+        self._customers.append(customer)
+        self._save_data()
+        self.notify_observers({"action": "add", "customer_id": new_id})
+        return True
+
+    def update(self, customer_id: int, customer_data: Dict[str, Any]) -> bool:
+        """Обновить данные клиента."""
+        customer = self.get_by_id(customer_id)
+        if customer is None:
+            return False
+        # Проверяем данные до изменения индексов
+        updated = Customer.from_dict({**customer_data, "customer_id": customer_id})
+        self._index_remove(customer)
+        customer.name = updated.name
+        customer.address = updated.address
+        customer.phone = updated.phone
+        customer.contact_person = updated.contact_person
+        self._index_insert(customer)
+        self._save_data()
+        self.notify_observers({"action": "update", "customer_id": customer_id})
+        return True
+
+    def delete(self, customer_id: int) -> bool:
+        """
+        Удалить клиента.
+        Позиция в списке и записи индексов помечаются надгробиями за O(1)
+        и O(log n); список уплотняется, когда надгробий становится много.
+        """
+        pos = self._positions.pop(customer_id, None)
+        if pos is None:
+            return False
+        self._index_remove(self._customers[pos])
+        self._customers[pos] = None
+        self._dead += 1
+        if self._dead > len(self._customers) * COMPACT_RATIO:
+            self._compact()
+        self._save_data()
+        self.notify_observers({"action": "delete", "customer_id": customer_id})
+        return True
+
     def sort_by_field(self, field: SortField, reverse: bool = False):
         """Сортировка по полю - ИСПОЛЬЗОВАНИЕ ИЗ ПРЕДЫДУЩЕЙ ЛР."""
         try:
-            if field == SortField.NAME:
-                self._customers.sort(key=lambda x: x.name.lower(), reverse=reverse)
-            elif field == SortField.CUSTOMER_ID:
-                self._customers.sort(key=lambda x: x.customer_id, reverse=reverse)
-            elif field == SortField.PHONE:
-                self._customers.sort(key=lambda x: x.phone, reverse=reverse)
-            elif field == SortField.ADDRESS:
-                self._customers.sort(key=lambda x: x.address.lower(), reverse=reverse)
-            elif field == SortField.CONTACT_PERSON:
-                self._customers.sort(key=lambda x: x.contact_person.lower(), reverse=reverse)
+            # Порядок уже есть в индексе: список переставляется без сортировки
+            self._reorder(list(self._sort_index(field).iter_customers(reverse)))
 
             self._save_data()
             self.notify_observers({"action": "sort", "field": field.value, "reverse": reverse})
@@ -42,25 +341,69 @@ class CustomerRepository(Observable):
                            sort_by: Optional[str] = None,
                            reverse: bool = False) -> List[ShortCustomer]:
         """Получить список с пагинацией - ИСПОЛЬЗОВАНИЕ СОРТИРОВКИ ИЗ ПРЕДЫДУЩЕЙ ЛР."""
-        filtered = self._customers
-        if filter_func:
-            filtered = [c for c in filtered if filter_func(c)]
-
-        # Сортировка - ИСПОЛЬЗОВАНИЕ ЛОГИКИ ИЗ ПРЕДЫДУЩЕЙ ЛР
-        if sort_by:
-            if sort_by == 'customer_id':
-                filtered.sort(key=lambda x: x.customer_id, reverse=reverse)
-            elif sort_by == 'name':
-                filtered.sort(key=lambda x: x.name.lower(), reverse=reverse)
-            elif sort_by == 'address':
-                filtered.sort(key=lambda x: x.address.lower(), reverse=reverse)
-            elif sort_by == 'phone':
-                filtered.sort(key=lambda x: x.phone, reverse=reverse)
-            elif sort_by == 'contact_person':
-                filtered.sort(key=lambda x: x.contact_person.lower(), reverse=reverse)
+        start = (k - 1) * n
 
+        # Сортировка - ИСПОЛЬЗОВАНИЕ ЛОГИКИ ИЗ ПРЕДЫДУЩЕЙ ЛР, через индекс
+        field = _sort_field(sort_by)
+        if field:
+            index = self._sort_index(field)
+            if filter_func:
+                matching = (c for c in index.iter_customers(reverse) if filter_func(c))
+                paginated = list(islice(matching, start, start + n))
+            else:
+                paginated = index.page(start, n, reverse)
+        elif filter_func:
+            matching = (c for c in self._live() if filter_func(c))
+            paginated = list(islice(matching, start, start + n))
+        else:
+            paginated = self._list_page(start, n)
+
+        return [ShortCustomer(c.customer_id, c.name, c.phone, c.contact_person) for c in paginated]
+
+    def query(self, k: int, n: int,
+              filter_func: Optional[Callable[[Customer], bool]] = None,
+              sort_by: Optional[str] = None,
+              reverse: bool = False) -> PageResult:
+        """Страница и общее число подходящих клиентов за один проход фильтра."""
         start = (k - 1) * n
-        end = start + n
-        paginated = filtered[start:end]
+        field = _sort_field(sort_by)
+        index = self._sort_index(field) if field else None
+
+        if filter_func:
+            source = index.iter_customers(reverse) if index else self._live()
+            matching = [c for c in source if filter_func(c)]
+            total = len(matching)
+            paginated = matching[start:start + n]
+        else:
+            total = len(self._positions)
+            paginated = index.page(start, n, reverse) if index else self._list_page(start, n)
+
+        items = [ShortCustomer(c.customer_id, c.name, c.phone, c.contact_person) for c in paginated]
+        return PageResult(items, total, max(1, -(-total // n)))
+
+    def get_page(self, n: int, cursor: Optional[str] = None,
+                 filter_func: Optional[Callable[[Customer], bool]] = None,
+                 sort_by: Optional[str] = None,
+                 reverse: bool = False) -> Tuple[List[ShortCustomer], Optional[str]]:
+        """
+        Страница по курсору (keyset-пагинация): продолжение ищется в индексе
+        бинарным поиском, без пропуска предыдущих страниц.
+        Возвращает клиентов страницы и курсор следующей (None — страница последняя).
+        """
+        index = self._sort_index(_sort_field(sort_by) or SortField.CUSTOMER_ID)
+        after = decode_cursor(cursor) if cursor else None
+
+        page = []
+        for entry in index.iter_entries(after, reverse):
+            if filter_func and not filter_func(entry[2]):
+                continue
+            if len(page) == n:
+                last = page[-1]
+                return self._to_short_list(page), encode_cursor(last[0], last[1])
+            page.append(entry)
+        return self._to_short_list(page), None
 
-        return [ShortCustomer(c.customer_id, c.name, c.phone, c.contact_person) for c in paginated]
\ No newline at end of file
+    @staticmethod
+    def _to_short_list(entries) -> List[ShortCustomer]:
+        """Короткие карточки клиентов из записей индекса."""
+        return [ShortCustomer(c.customer_id, c.name, c.phone, c.contact_person) for _, _, c in entries]
\ No newline at end of file
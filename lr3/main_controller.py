@@ -67,10 +67,13 @@ class MainController:
         sort_by = params.get('sort', ['customer_id'])[0]  # ПАРАМЕТР СОРТИРОВКИ
         reverse = params.get('reverse', ['false'])[0].lower() == 'true'
 
-        # Получаем отсортированный список - ИСПОЛЬЗОВАНИЕ ЛОГИКИ СОРТИРОВКИ
-        short_list = self.repository.get_k_n_short_list(
+        # Получаем отсортированный список - ИСПОЛЬЗОВАНИЕ ЛОГИКИ СОРТИРОВКИ.
+        # Страница и число страниц считаются за один проход фильтра
+        result = self.repository.query(
             page, customers_per_page, filter_func, sort_by, reverse
         )
+        short_list = result.items
+        total_pages = result.total_pages
 
         # Генерируем ссылки для сортировки
         sort_links = {}
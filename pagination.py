@@ -0,0 +1,222 @@
+"""
+Пагинация для репозиториев клиентов.
+Курсор — непрозрачная строка с ключом сортировки и ID последнего элемента
+страницы, поэтому следующая страница не требует пропуска предыдущих.
+Небольшое окно страницы выбирается кучей вместо сортировки всего списка.
+"""
+
+import base64
+import heapq
+import json
+import random
+import time
+from operator import itemgetter
+from typing import List, Optional, Any, Callable, Iterable, NamedTuple, Tuple, Union
+from entities import Customer
+from repository_base import SortField
+
+
+# Ключи сортировки в памяти; в БД им соответствуют выражения CustomerRepDB
+SORT_KEYS = {
+    SortField.CUSTOMER_ID: lambda x: x.customer_id,
+    SortField.NAME: lambda x: x.name.lower(),
+    SortField.ADDRESS: lambda x: x.address.lower(),
+    SortField.PHONE: lambda x: x.phone,
+    SortField.CONTACT_PERSON: lambda x: x.contact_person.lower(),
+}
+
+# Ключ сортировки можно передать полем: тогда БД может сортировать сама
+SortKey = Union[SortField, Callable[[Customer], Any]]
+
+
+def resolve_sort_key(sort_key: Optional[SortKey]) -> Optional[Callable[[Customer], Any]]:
+    """Функция ключа для поля SortField; функция возвращается как есть."""
+    if isinstance(sort_key, SortField):
+        return SORT_KEYS[sort_key]
+    return sort_key
+
+
+# Окно страницы выбирается кучей, если оно меньше 1/HEAP_SELECT_RATIO
+# от числа элементов; иначе полная сортировка выгоднее (см. bench_select_page)
+HEAP_SELECT_RATIO = 8
+
+
+def select_page(
+    items: List[Any],
+    start: int,
+    count: int,
+    key: Callable[[Any], Any],
+    reverse: bool = False,
+) -> List[Any]:
+    """
+    Срез [start:start + count] отсортированного списка без полной сортировки.
+    Для небольшого окна используется heapq.nsmallest/nlargest (O(N log k)),
+    результат совпадает с sorted(items, key=key, reverse=reverse)[start:start + count].
+
+    Args:
+        items: элементы (список не изменяется)
+        start: индекс начала окна
+        count: размер окна
+        key: функция ключа сортировки
+        reverse: обратный порядок
+
+    Returns:
+        Элементы окна
+    """
+    end = start + count
+    if count <= 0 or start >= len(items):
+        return []
+    if end * HEAP_SELECT_RATIO < len(items):
+        select = heapq.nlargest if reverse else heapq.nsmallest
+        return select(end, items, key=key)[start:]
+    return sorted(items, key=key, reverse=reverse)[start:end]
+
+
+class PageResult(NamedTuple):
+    """Страница вместе с общим количеством подходящих элементов."""
+
+    items: List[Any]
+    total: int
+    total_pages: int
+
+
+def page_count(total: int, n: int) -> int:
+    """Число страниц по n элементов (не меньше одной)."""
+    return max(1, -(-total // n)) if n > 0 else 1
+
+
+def query_page(
+    customers: List[Customer],
+    k: int,
+    n: int,
+    filter_func: Optional[Callable[[Customer], bool]] = None,
+    sort_key: Optional[SortKey] = None,
+    reverse: bool = False,
+) -> PageResult:
+    """
+    Страница k и общее число подходящих клиентов за один проход фильтра.
+    Без sort_key клиенты упорядочиваются по ID (reverse не учитывается).
+
+    Args:
+        customers: все клиенты репозитория
+        k: номер страницы
+        n: размер страницы
+        filter_func: функция фильтрации
+        sort_key: функция ключа сортировки или поле SortField
+        reverse: обратный порядок
+
+    Returns:
+        PageResult с клиентами страницы
+    """
+    sort_key = resolve_sort_key(sort_key)
+    matching = customers if filter_func is None else [c for c in customers if filter_func(c)]
+    start = (k - 1) * n
+    if sort_key:
+        items = select_page(matching, start, n, sort_key, reverse)
+    else:
+        items = select_page(matching, start, n, SORT_KEYS[SortField.CUSTOMER_ID])
+    return PageResult(items, len(matching), page_count(len(matching), n))
+
+
+def encode_cursor(key: Any, c_id: int) -> str:
+    """
+    Упаковать позицию в курсор.
+
+    Args:
+        key: значение ключа сортировки последнего элемента
+        c_id: ID последнего элемента
+
+    Returns:
+        Строка-курсор
+    """
+    raw = json.dumps([key, c_id], ensure_ascii=False).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii")
+
+
+def decode_cursor(cursor: str) -> Tuple[Any, int]:
+    """
+    Распаковать курсор.
+
+    Args:
+        cursor: строка, полученная из encode_cursor
+
+    Returns:
+        Пара (ключ сортировки, ID)
+    """
+    try:
+        key, c_id = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        return key, int(c_id)
+    except (ValueError, TypeError) as e:
+        raise ValueError(f"Некорректный курсор: {cursor}") from e
+
+
+def keyset_page(
+    customers: Iterable[Customer],
+    n: int,
+    cursor: Optional[str] = None,
+    filter_func: Optional[Callable[[Customer], bool]] = None,
+    sort_field: SortField = SortField.CUSTOMER_ID,
+    reverse: bool = False,
+) -> Tuple[List[Customer], Optional[str]]:
+    """
+    Страница по курсору для репозиториев, хранящих клиентов в памяти.
+
+    Args:
+        customers: все клиенты репозитория
+        n: размер страницы
+        cursor: курсор предыдущей страницы (None — первая страница)
+        filter_func: функция фильтрации
+        sort_field: поле сортировки
+        reverse: обратный порядок
+
+    Returns:
+        Клиенты страницы и курсор следующей страницы (None, если она последняя)
+    """
+    key_func = SORT_KEYS[sort_field]
+    position = decode_cursor(cursor) if cursor is not None else None
+
+    entries = []
+    for c in customers:
+        if filter_func is not None and not filter_func(c):
+            continue
+        entry = (key_func(c), c.customer_id, c)
+        if position is not None and (entry[:2] >= position if reverse else entry[:2] <= position):
+            continue
+        entries.append(entry)
+
+    # Лишний (n+1)-й элемент показывает, есть ли следующая страница
+    window = select_page(entries, 0, n + 1, key=itemgetter(0, 1), reverse=reverse)
+    page = window[:n]
+    if len(window) > n:
+        last = page[-1]
+        return [e[2] for e in page], encode_cursor(last[0], last[1])
+    return [e[2] for e in page], None
+
+
+def bench_select_page(size: int = 100_000, page_size: int = 20) -> None:
+    """Сравнение выбора страницы кучей и полной сортировкой по размеру окна."""
+    rows = [
+        (random.randint(1, size), "".join(random.choices("абвгдежзик", k=8)))
+        for _ in range(size)
+    ]
+    key = lambda x: x[1]
+    print(f"{size} элементов, страница {page_size}")
+    print(f"{'окно':>8} {'куча, мс':>10} {'сортировка, мс':>15}")
+    for pages in (1, 10, 50, 250, 625, 1250, 2500, 5000):
+        end = pages * page_size
+        if end > size:
+            break
+        timings = []
+        for run in (lambda: heapq.nsmallest(end, rows, key=key),
+                    lambda: sorted(rows, key=key)[:end]):
+            best = float("inf")
+            for _ in range(3):
+                t0 = time.perf_counter()
+                run()
+                best = min(best, time.perf_counter() - t0)
+            timings.append(best * 1000)
+        print(f"{end:>8} {timings[0]:>10.1f} {timings[1]:>15.1f}")
+
+
+if __name__ == "__main__":
+    bench_select_page()
@@ -0,0 +1,328 @@
+"""
+Декларативные условия отбора клиентов.
+Одно и то же условие компилируется в параметризованный WHERE для CustomerRepDB
+и в функцию Python для репозиториев в памяти и файловых репозиториев.
+
+Пример:
+    condition = field("name").prefix("ан") & field("address").contains("Москва")
+    repository.query(1, 20, condition, SortField.NAME)
+
+Условие само является функцией Customer -> bool, поэтому его можно
+передавать везде, где ожидается filter_func.
+"""
+
+import re
+from abc import ABC, abstractmethod
+from operator import attrgetter
+from typing import Any, Callable, Iterable, List, Optional, Sequence, Tuple, Union
+from entities import Customer
+from repository_base import SortField
+
+# Поля клиента совпадают с именами столбцов таблицы customers
+FIELDS = tuple(f.value for f in SortField)
+
+Filter = Union["Predicate", Callable[[Customer], bool]]
+
+
+def _like_pattern(value: str) -> str:
+    """Экранировать спецсимволы LIKE (обратная косая черта — экранирующий символ по умолчанию)."""
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+class Predicate(ABC):
+    """
+    Условие на поля клиента.
+    Условия объединяются операторами & (и) и | (или).
+    """
+
+    _compiled: Optional[Callable[[Customer], bool]] = None
+
+    @abstractmethod
+    def to_sql(self) -> Tuple[str, List[Any]]:
+        """
+        Скомпилировать условие в SQL.
+
+        Returns:
+            Текст условия с плейсхолдерами %s и список параметров
+        """
+
+    @abstractmethod
+    def _build(self) -> Callable[[Customer], bool]:
+        """Построить функцию Python, проверяющую условие."""
+
+    def compile(self) -> Callable[[Customer], bool]:
+        """Функция Python для условия (строится один раз)."""
+        if self._compiled is None:
+            self._compiled = self._build()
+        return self._compiled
+
+    def __call__(self, customer: Customer) -> bool:
+        return self.compile()(customer)
+
+    def __and__(self, other: "Predicate") -> "Predicate":
+        return and_(self, other)
+
+    def __or__(self, other: "Predicate") -> "Predicate":
+        return or_(self, other)
+
+
+class _FieldPredicate(Predicate):
+    """Условие на одно поле."""
+
+    def __init__(self, name: str):
+        self._name = name
+        self._getter = attrgetter(name)
+
+
+class Eq(_FieldPredicate):
+    """Точное совпадение."""
+
+    def __init__(self, name: str, value: Any):
+        super().__init__(name)
+        self._value = value
+
+    def to_sql(self) -> Tuple[str, List[Any]]:
+        return f"{self._name} = %s", [self._value]
+
+    def _build(self) -> Callable[[Customer], bool]:
+        getter, value = self._getter, self._value
+        return lambda c: getter(c) == value
+
+
+class Prefix(_FieldPredicate):
+    """Значение начинается с подстроки (по умолчанию без учёта регистра)."""
+
+    def __init__(self, name: str, value: str, ignore_case: bool = True):
+        super().__init__(name)
+        self._value = value.lower() if ignore_case else value
+        self._ignore_case = ignore_case
+
+    def to_sql(self) -> Tuple[str, List[Any]]:
+        column = f"lower({self._name})" if self._ignore_case else self._name
+        return f"{column} LIKE %s", [_like_pattern(self._value) + "%"]
+
+    def _build(self) -> Callable[[Customer], bool]:
+        getter, value = self._getter, self._value
+        if self._ignore_case:
+            return lambda c: getter(c).lower().startswith(value)
+        return lambda c: getter(c).startswith(value)
+
+
+class Contains(_FieldPredicate):
+    """Значение содержит подстроку (по умолчанию без учёта регистра)."""
+
+    def __init__(self, name: str, value: str, ignore_case: bool = True):
+        super().__init__(name)
+        self._value = value.lower() if ignore_case else value
+        self._ignore_case = ignore_case
+
+    def to_sql(self) -> Tuple[str, List[Any]]:
+        column = f"lower({self._name})" if self._ignore_case else self._name
+        return f"{column} LIKE %s", ["%" + _like_pattern(self._value) + "%"]
+
+    def _build(self) -> Callable[[Customer], bool]:
+        getter, value = self._getter, self._value
+        if self._ignore_case:
+            return lambda c: value in getter(c).lower()
+        return lambda c: value in getter(c)
+
+
+class Regex(_FieldPredicate):
+    """
+    Поиск регулярного выражения в значении (re.search / оператор ~).
+    Используйте конструкции, общие для Python и PostgreSQL: классы символов,
+    квантификаторы, ^ и $; обратные ссылки и \\d внутри [] в них различаются.
+    """
+
+    def __init__(self, name: str, pattern: str, ignore_case: bool = False):
+        super().__init__(name)
+        self._pattern = pattern
+        self._ignore_case = ignore_case
+
+    def to_sql(self) -> Tuple[str, List[Any]]:
+        return f"{self._name} {'~*' if self._ignore_case else '~'} %s", [self._pattern]
+
+    def _build(self) -> Callable[[Customer], bool]:
+        search = re.compile(self._pattern, re.IGNORECASE if self._ignore_case else 0).search
+        getter = self._getter
+        return lambda c: search(getter(c)) is not None
+
+
+class In(_FieldPredicate):
+    """Значение входит в набор."""
+
+    def __init__(self, name: str, values: Iterable[Any]):
+        super().__init__(name)
+        self._values = list(dict.fromkeys(values))
+
+    def to_sql(self) -> Tuple[str, List[Any]]:
+        if not self._values:
+            return "FALSE", []
+        return f"{self._name} = ANY(%s)", [self._values]
+
+    def _build(self) -> Callable[[Customer], bool]:
+        getter, values = self._getter, frozenset(self._values)
+        return lambda c: getter(c) in values
+
+
+class Range(_FieldPredicate):
+    """
+    low <= значение <= high; отсутствующая граница не проверяется.
+    Строки сравниваются посимвольно, как в Python (в БД — по правилам сортировки столбца).
+    """
+
+    def __init__(self, name: str, low: Any = None, high: Any = None):
+        super().__init__(name)
+        self._low = low
+        self._high = high
+
+    def to_sql(self) -> Tuple[str, List[Any]]:
+        conditions, params = [], []
+        if self._low is not None:
+            conditions.append(f"{self._name} >= %s")
+            params.append(self._low)
+        if self._high is not None:
+            conditions.append(f"{self._name} <= %s")
+            params.append(self._high)
+        return " AND ".join(conditions) or "TRUE", params
+
+    def _build(self) -> Callable[[Customer], bool]:
+        getter, low, high = self._getter, self._low, self._high
+        if low is None and high is None:
+            return lambda c: True
+        if low is None:
+            return lambda c: getter(c) <= high
+        if high is None:
+            return lambda c: low <= getter(c)
+        return lambda c: low <= getter(c) <= high
+
+
+class _Compound(Predicate):
+    """Объединение нескольких условий."""
+
+    _operator = ""
+    _empty = ""
+
+    def __init__(self, *predicates: Predicate):
+        # Вложенные условия того же вида разворачиваются: (a & b) & c -> a & b & c
+        self._predicates: List[Predicate] = []
+        for predicate in predicates:
+            if type(predicate) is type(self):
+                self._predicates.extend(predicate._predicates)
+            else:
+                self._predicates.append(predicate)
+
+    def to_sql(self) -> Tuple[str, List[Any]]:
+        if not self._predicates:
+            return self._empty, []
+        parts, params = [], []
+        for predicate in self._predicates:
+            sql, predicate_params = predicate.to_sql()
+            parts.append(f"({sql})")
+            params.extend(predicate_params)
+        return f" {self._operator} ".join(parts), params
+
+
+class And(_Compound):
+    """Все условия выполняются."""
+
+    _operator = "AND"
+    _empty = "TRUE"
+
+    def _build(self) -> Callable[[Customer], bool]:
+        checks = [p.compile() for p in self._predicates]
+        if len(checks) == 1:
+            return checks[0]
+        return lambda c: all(check(c) for check in checks)
+
+
+class Or(_Compound):
+    """Выполняется хотя бы одно условие."""
+
+    _operator = "OR"
+    _empty = "FALSE"
+
+    def _build(self) -> Callable[[Customer], bool]:
+        checks = [p.compile() for p in self._predicates]
+        if len(checks) == 1:
+            return checks[0]
+        return lambda c: any(check(c) for check in checks)
+
+
+class Field:
+    """Поле клиента, для которого строятся условия."""
+
+    def __init__(self, name: Union[str, SortField]):
+        """
+        Args:
+            name: имя поля или SortField
+
+        Raises:
+            ValueError: неизвестное поле
+        """
+        name = name.value if isinstance(name, SortField) else name
+        if name not in FIELDS:
+            raise ValueError(f"Неизвестное поле: {name}")
+        self._name = name
+
+    def eq(self, value: Any) -> Predicate:
+        """Поле равно value."""
+        return Eq(self._name, value)
+
+    def prefix(self, value: str, ignore_case: bool = True) -> Predicate:
+        """Поле начинается с value."""
+        return Prefix(self._name, value, ignore_case)
+
+    def contains(self, value: str, ignore_case: bool = True) -> Predicate:
+        """Поле содержит value."""
+        return Contains(self._name, value, ignore_case)
+
+    def regex(self, pattern: str, ignore_case: bool = False) -> Predicate:
+        """В поле найдено регулярное выражение pattern."""
+        return Regex(self._name, pattern, ignore_case)
+
+    def in_(self, values: Iterable[Any]) -> Predicate:
+        """Поле равно одному из values."""
+        return In(self._name, values)
+
+    def range(self, low: Any = None, high: Any = None) -> Predicate:
+        """Поле в диапазоне [low, high]."""
+        return Range(self._name, low, high)
+
+
+def field(name: Union[str, SortField]) -> Field:
+    """Поле клиента для построения условий: field("name").prefix("ан")."""
+    return Field(name)
+
+
+def and_(*predicates: Predicate) -> Predicate:
+    """Условие «и» для всех predicates."""
+    return And(*predicates)
+
+
+def or_(*predicates: Predicate) -> Predicate:
+    """Условие «или» для predicates."""
+    return Or(*predicates)
+
+
+def combine_filters(filters: Sequence[Optional[Filter]]) -> Optional[Filter]:
+    """
+    Объединить фильтры логическим И.
+    Если все фильтры — условия Predicate, результат тоже Predicate и может
+    быть выполнен в БД; иначе условия компилируются и объединяются в функцию.
+
+    Args:
+        filters: условия и функции-фильтры (None пропускаются)
+
+    Returns:
+        Объединённый фильтр или None, если фильтров нет
+    """
+    filters = [f for f in filters if f is not None]
+    if not filters:
+        return None
+    if all(isinstance(f, Predicate) for f in filters):
+        return filters[0] if len(filters) == 1 else And(*filters)
+    checks = [f.compile() if isinstance(f, Predicate) else f for f in filters]
+    if len(checks) == 1:
+        return checks[0]
+    return lambda customer: all(check(customer) for check in checks)
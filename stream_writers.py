@@ -0,0 +1,61 @@
+"""
+Потоковая запись файлов репозиториев.
+Записи сериализуются по одной (JSON) или пачками (YAML) прямо в файл,
+без построения общего списка.
+"""
+
+import json
+from typing import Any, Dict, Iterable, Optional, TextIO
+
+
+def write_json_array(f: TextIO, records: Iterable[Dict[str, Any]], indent: Optional[int] = 4) -> None:
+    """
+    Записать JSON-массив. При indent=4 результат совпадает с json.dump.
+
+    Args:
+        f: открытый на запись текстовый файл
+        records: словари полей записей
+        indent: отступ; None — компактная запись без отступов и пробелов
+    """
+    encoder = json.JSONEncoder(ensure_ascii=False, indent=indent,
+                               separators=None if indent is not None else (',', ':'))
+    if indent is None:
+        prefix, separator, suffix = "[", ",", "]"
+    else:
+        pad = " " * indent
+        prefix, separator, suffix = "[\n" + pad, ",\n" + pad, "\n]"
+    first = True
+    for record in records:
+        text = encoder.encode(record)
+        if indent is not None:
+            text = text.replace("\n", "\n" + pad)
+        f.write(prefix if first else separator)
+        f.write(text)
+        first = False
+    f.write("[]" if first else suffix)
+
+
+def write_yaml_sequence(f: TextIO, records: Iterable[Dict[str, Any]], chunk_size: int = 1000) -> None:
+    """
+    Записать YAML-последовательность пачками по chunk_size записей.
+    libyaml (C-реализация) используется, если установлена. PyYAML
+    импортируется здесь: модуль нужен и лабораторным, которые пишут только JSON.
+
+    Args:
+        f: открытый на запись текстовый файл
+        records: словари полей записей
+        chunk_size: число записей в одном вызове yaml.dump
+    """
+    import yaml
+
+    dumper = getattr(yaml, "CSafeDumper", yaml.SafeDumper)
+    chunk = []
+    written = False
+    for record in records:
+        chunk.append(record)
+        if len(chunk) == chunk_size:
+            yaml.dump(chunk, f, Dumper=dumper, allow_unicode=True, sort_keys=False)
+            chunk = []
+            written = True
+    if chunk or not written:
+        yaml.dump(chunk, f, Dumper=dumper, allow_unicode=True, sort_keys=False)
@@ -0,0 +1,191 @@
+"""Тесты пула подключений на поддельных подключениях (без сервера PostgreSQL)."""
+
+import threading
+import time
+
+import pytest
+
+psycopg2 = pytest.importorskip("psycopg2")
+
+import connection_pool
+from connection_pool import ConnectionPool
+from psycopg2.extensions import TRANSACTION_STATUS_IDLE, TRANSACTION_STATUS_INTRANS
+from psycopg2.pool import PoolError
+
+
+class FakeCursor:
+    def __init__(self, conn):
+        self._conn = conn
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, query, params=None):
+        if self._conn.broken:
+            raise psycopg2.OperationalError("server closed the connection unexpectedly")
+        self._conn.queries.append(query)
+
+
+class FakeConnection:
+    def __init__(self):
+        self.closed = 0
+        self.broken = False
+        self.status = TRANSACTION_STATUS_IDLE
+        self.queries = []
+        self.rollbacks = 0
+
+    def cursor(self):
+        return FakeCursor(self)
+
+    def get_transaction_status(self):
+        return self.status
+
+    def commit(self):
+        self.status = TRANSACTION_STATUS_IDLE
+
+    def rollback(self):
+        self.rollbacks += 1
+        self.status = TRANSACTION_STATUS_IDLE
+
+    def close(self):
+        self.closed = 1
+
+
+class Factory:
+    """Функция connect= пула: запоминает все созданные подключения."""
+
+    def __init__(self):
+        self.created = []
+
+    def __call__(self):
+        conn = FakeConnection()
+        self.created.append(conn)
+        return conn
+
+
+@pytest.fixture
+def factory():
+    return Factory()
+
+
+def make_pool(factory, **kwargs):
+    kwargs.setdefault("min_size", 0)
+    kwargs.setdefault("max_size", 2)
+    return ConnectionPool({}, connect=factory, **kwargs)
+
+
+def test_connection_is_reused(factory):
+    pool = make_pool(factory, min_size=1)
+    assert len(factory.created) == 1
+
+    for _ in range(5):
+        conn = pool.getconn()
+        pool.putconn(conn)
+    assert factory.created == [conn]
+    assert pool.stats().size == 1
+
+
+def test_unfinished_transaction_is_rolled_back_on_return(factory):
+    pool = make_pool(factory)
+    conn = pool.getconn()
+    conn.status = TRANSACTION_STATUS_INTRANS
+    pool.putconn(conn)
+    assert conn.rollbacks == 1 and not conn.closed
+    assert pool.getconn() is conn
+
+
+def test_getconn_waits_for_returned_connection(factory):
+    pool = make_pool(factory, max_size=1)
+    conn = pool.getconn()
+    timer = threading.Timer(0.1, pool.putconn, [conn])
+    timer.start()
+    try:
+        started = time.monotonic()
+        assert pool.getconn(timeout=5) is conn
+        assert time.monotonic() - started >= 0.05
+    finally:
+        timer.join()
+    assert len(factory.created) == 1
+    assert pool.stats().max_wait >= 0.05
+
+
+def test_getconn_times_out_when_pool_is_full(factory):
+    pool = make_pool(factory, max_size=2)
+    held = [pool.getconn(), pool.getconn()]
+
+    with pytest.raises(PoolError):
+        pool.getconn(timeout=0.05)
+    assert len(factory.created) == 2
+    assert pool.stats().timeouts == 1
+    pool.putconn(held[0])
+    assert pool.getconn(timeout=0) is held[0]
+
+
+def test_failed_health_check_replaces_connection(factory):
+    pool = make_pool(factory, min_size=1, health_check_interval=0)
+    stale = factory.created[0]
+    stale.broken = True
+
+    conn = pool.getconn()
+    assert conn is not stale and stale.closed
+    assert factory.created == [stale, conn]
+    assert pool.stats().size == 1
+
+
+def test_healthy_idle_connection_is_checked_and_kept(factory):
+    pool = make_pool(factory, min_size=1, health_check_interval=0)
+    conn = pool.getconn()
+    assert conn is factory.created[0]
+    assert conn.queries == ["SELECT 1"]
+
+
+def test_closed_connection_is_replaced_without_query(factory):
+    pool = make_pool(factory, min_size=1)
+    factory.created[0].closed = 1
+    conn = pool.getconn()
+    assert conn is factory.created[1]
+    assert factory.created[0].queries == []
+
+
+def test_broken_connection_is_not_returned_by_context_manager(factory):
+    pool = make_pool(factory)
+    with pytest.raises(psycopg2.OperationalError):
+        with pool.connection() as conn:
+            raise psycopg2.OperationalError("connection lost")
+    assert conn.closed
+    assert pool.stats().size == 0 and pool.getconn() is not conn
+
+
+def test_stats(factory, monkeypatch):
+    clock = [100.0]
+    monkeypatch.setattr(connection_pool.time, "monotonic", lambda: clock[0])
+    pool = make_pool(factory, min_size=1, max_size=4)
+
+    first = pool.getconn()
+    second = pool.getconn()
+    clock[0] += 10.0
+    pool.putconn(second)
+    clock[0] += 10.0
+
+    stats = pool.stats()
+    assert (stats.size, stats.idle, stats.in_use, stats.max_size) == (2, 1, 1, 4)
+    assert (stats.peak_in_use, stats.acquisitions, stats.timeouts) == (2, 2, 0)
+    assert (stats.avg_wait, stats.max_wait) == (0.0, 0.0)
+    # Занято 2 подключения 10 с и одно ещё 10 с из 4 * 20 возможных
+    assert stats.utilization == pytest.approx(30 / 80)
+
+    pool.putconn(first)
+    pool.reset_stats()
+    stats = pool.stats()
+    assert (stats.acquisitions, stats.peak_in_use, stats.utilization) == (0, 0, 0.0)
+
+
+def test_closed_pool_refuses_connections(factory):
+    pool = make_pool(factory, min_size=2)
+    pool.close()
+    assert all(conn.closed for conn in factory.created)
+    with pytest.raises(PoolError):
+        pool.getconn()
@@ -0,0 +1,90 @@
+"""
+EXPLAIN-проверки индексов схемы CustomerRepDB (2.5.py).
+Нужна тестовая база PostgreSQL, таблицы customers и schema_version в ней
+пересоздаются:
+
+    CUSTOMERS_TEST_DSN="postgresql://user@host/test_db" python -m pytest tests
+"""
+
+import importlib.util
+import os
+
+import pytest
+
+DSN = os.environ.get("CUSTOMERS_TEST_DSN")
+pytestmark = pytest.mark.skipif(not DSN, reason="не задан CUSTOMERS_TEST_DSN")
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ROWS = 20_000
+SORT_FIELDS = ("name", "address", "phone", "contact_person")
+SEARCH_FIELDS = ("name", "address", "contact_person")
+
+
+@pytest.fixture(scope="module")
+def db_module():
+    for module in ("psycopg2", "entities", "repository_base"):
+        pytest.importorskip(module)
+    spec = importlib.util.spec_from_file_location("customer_rep_db", os.path.join(ROOT, "2.5.py"))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+@pytest.fixture(scope="module")
+def repository(db_module):
+    import psycopg2
+
+    conn = psycopg2.connect(DSN)
+    conn.autocommit = True
+    with conn.cursor() as cursor:
+        cursor.execute("DROP TABLE IF EXISTS customers, schema_version")
+        repository = db_module.CustomerRepDB({"dsn": DSN})
+        cursor.execute("""
+            INSERT INTO customers (name, address, phone, contact_person)
+            SELECT 'Клиент ' || i, 'ул. Садовая, д. ' || i, '+7' || lpad(i::text, 10, '0'), 'Контакт ' || i
+            FROM generate_series(1, %s) AS i
+        """, (ROWS,))
+        # Без VACUUM новые строки лежат в списке ожидания GIN-индексов,
+        # и планировщик считает триграммный поиск дороже полного просмотра
+        cursor.execute("VACUUM ANALYZE customers")
+    yield repository
+    conn.close()
+    db_module.DBConnection().close()
+
+
+def plan_text(plan):
+    return "\n".join(plan)
+
+
+def test_unique_phone_applies_even_without_trigram_extension(repository):
+    # Версия 3 (pg_trgm) необязательная и не блокирует версию 4
+    assert set(repository.missing_migrations) <= {3}
+    assert repository.schema_version == 4
+
+
+@pytest.mark.parametrize("reverse", [False, True])
+@pytest.mark.parametrize("name", SORT_FIELDS)
+def test_sorted_page_uses_sort_index(repository, name, reverse):
+    from repository_base import SortField
+
+    plan = plan_text(repository.explain_query(50, 20, None, SortField(name), reverse))
+    # Порядок по телефону даёт уникальный индекс версии 4
+    index = "customers_phone_key" if name == "phone" else f"customers_{name}_sort_idx"
+    assert index in plan, plan
+
+
+def test_phone_lookup_uses_unique_index(repository):
+    from predicates import field
+
+    plan = plan_text(repository.explain_query(1, 20, field("phone").eq("+70000012345")))
+    assert "customers_phone_key" in plan, plan
+
+
+@pytest.mark.parametrize("name", SEARCH_FIELDS)
+def test_substring_search_uses_trigram_index(repository, name):
+    from predicates import field
+
+    if 3 in repository.missing_migrations:
+        pytest.skip("на сервере нет расширения pg_trgm")
+    plan = plan_text(repository.explain_query(1, 20, field(name).contains(" 1234")))
+    assert f"customers_{name}_trgm_idx" in plan, plan
@@ -0,0 +1,338 @@
+"""Тесты файловых репозиториев из lab 2.3 (модуль загружается по пути)."""
+
+import importlib.machinery
+import importlib.util
+import json
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture(scope="module")
+def lab():
+    pytest.importorskip("yaml")
+    loader = importlib.machinery.SourceFileLoader("lab23", os.path.join(ROOT, "lab 2.3"))
+    spec = importlib.util.spec_from_loader("lab23", loader)
+    module = importlib.util.module_from_spec(spec)
+    # Пул процессов (шарды) находит функции загрузки по имени модуля
+    sys.modules["lab23"] = module
+    loader.exec_module(module)
+    yield module
+    del sys.modules["lab23"]
+
+
+def customer(lab, name):
+    return lab.Customer(1, f"ООО {name}", "Москва", "+79160000000", f"{name} Иванов")
+
+
+def names(repo):
+    # Краткая строка: "ID: 1, Name: ООО Альфа, Phone: +79160000000"
+    return [line.split(", ")[1][len("Name: "):] for line in repo.get_k_n_short_list(1, 100)]
+
+
+def ids(repo):
+    return [int(line.split(", ")[0][len("ID: "):]) for line in repo.get_k_n_short_list(1, 100)]
+
+
+def fill(repo, lab, *customer_names):
+    repo.add_many(customer(lab, name) for name in customer_names)
+    repo.write_to_file()
+    return repo
+
+
+def rewrite(path, text):
+    # Размер файла меняется, поэтому отпечаток отличается даже при той же mtime
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(text)
+
+
+@pytest.mark.parametrize("empty", ["[]", ""])
+def test_json_refresh_clears_list_emptied_outside(lab, tmp_path, empty):
+    path = str(tmp_path / "customers.json")
+    repo = fill(lab.Customer_rep_json(path), lab, "Альфа", "Бета", "Гамма")
+
+    rewrite(path, empty)
+    assert repo.refresh()
+    assert repo.get_count() == 0 and names(repo) == []
+    assert repo.get_by_id(1) is None
+
+
+def test_json_refresh_replaces_list_rewritten_outside(lab, tmp_path):
+    path = str(tmp_path / "customers.json")
+    repo = fill(lab.Customer_rep_json(path), lab, "Альфа", "Бета")
+
+    rewrite(path, json.dumps([customer(lab, "Дельта").to_dict()], ensure_ascii=False))
+    assert repo.refresh()
+    assert names(repo) == ["ООО Дельта"]
+
+
+@pytest.mark.parametrize("empty", ["[]\n", ""])
+def test_yaml_refresh_clears_list_emptied_outside(lab, tmp_path, empty):
+    path = str(tmp_path / "customers.yaml")
+    repo = fill(lab.Customer_rep_yaml(path), lab, "Альфа", "Бета", "Гамма")
+
+    rewrite(path, empty)
+    assert repo.refresh()
+    assert repo.get_count() == 0 and names(repo) == []
+
+
+def load_yaml_without_parsing(lab, path, monkeypatch):
+    # Тёплая загрузка: данные берутся из снимка, YAML не разбирается
+    with monkeypatch.context() as m:
+        m.setattr(lab.yaml, "load", pytest.fail)
+        return lab.Customer_rep_yaml(path)
+
+
+def test_yaml_snapshot_cold_and_warm_load(lab, tmp_path, monkeypatch):
+    path = str(tmp_path / "customers.yaml")
+    fill(lab.Customer_rep_yaml(path), lab, "Альфа", "Бета", "Гамма")
+    os.remove(path + ".snap")
+
+    cold = lab.Customer_rep_yaml(path)
+    assert names(cold) == ["ООО Альфа", "ООО Бета", "ООО Гамма"]
+    warm = load_yaml_without_parsing(lab, path, monkeypatch)
+    assert names(warm) == names(cold)
+
+
+@pytest.mark.parametrize("text", ["[]\n", ""])
+def test_yaml_snapshot_follows_file_emptied_outside(lab, tmp_path, monkeypatch, text):
+    path = str(tmp_path / "customers.yaml")
+    repo = fill(lab.Customer_rep_yaml(path), lab, "Альфа", "Бета", "Гамма")
+
+    rewrite(path, text)
+    assert repo.refresh() and repo.get_count() == 0
+    # Снимок, сохранённый при refresh, описывает новый (пустой) файл
+    assert load_yaml_without_parsing(lab, path, monkeypatch).get_count() == 0
+    os.remove(path + ".snap")
+    assert lab.Customer_rep_yaml(path).get_count() == 0
+
+
+def test_yaml_snapshot_not_written_from_unsaved_changes(lab, tmp_path, monkeypatch):
+    path = str(tmp_path / "customers.yaml")
+    repo = fill(lab.Customer_rep_yaml(path), lab, "Альфа")
+    repo.add(customer(lab, "Бета"))  # не записан в файл
+
+    rewrite(path, "[]\n")
+    repo.refresh()
+    assert load_yaml_without_parsing(lab, path, monkeypatch).get_count() == 0
+
+
+def test_yaml_snapshot_of_previous_version_is_ignored(lab, tmp_path):
+    import hashlib
+    import marshal
+
+    path = str(tmp_path / "customers.yaml")
+    rewrite(path, "[]\n")
+    # Снимок версии 2 мог быть сохранён с ключом нового файла, но со старыми строками
+    stat = os.stat(path)
+    payload = marshal.dumps(((1, "ООО Альфа", "Москва", "+79160000000", "Альфа Иванов"),))
+    with open(path + ".snap", "wb") as f:
+        marshal.dump((2,
+                      (stat.st_mtime_ns, stat.st_size, lab.file_digest(path)),
+                      hashlib.sha256(payload).hexdigest(), payload), f)
+
+    assert lab.Customer_rep_yaml(path).get_count() == 0
+
+
+def sharded(lab, path, **kwargs):
+    return lab.Customer_rep_json_sharded(path, shards=3, **kwargs)
+
+
+def shard_files(repo):
+    return [shard._file_path for shard in repo._shards]
+
+
+def test_sharded_load_falls_back_when_pool_fails(lab, tmp_path, monkeypatch):
+    import multiprocessing
+    from concurrent.futures import ProcessPoolExecutor
+
+    path = str(tmp_path / "customers.json")
+    fill(sharded(lab, path), lab, *(f"Клиент {i}" for i in range(30)))
+    # При spawn дочерний процесс не может импортировать модуль, загруженный по пути
+    spawn = multiprocessing.get_context("spawn")
+    monkeypatch.setattr(lab, "ProcessPoolExecutor",
+                        lambda workers: ProcessPoolExecutor(workers, mp_context=spawn))
+    monkeypatch.setattr(lab.Customer_rep_json_sharded, "PARALLEL_MIN_BYTES", 0)
+
+    repo = sharded(lab, path, workers=3)
+    assert repo.get_count() == 30
+    repo.add(customer(lab, "Новый"))
+    repo.write_to_file()
+    assert sharded(lab, path, workers=1).get_count() == 31
+
+
+@pytest.mark.parametrize("load", ["eager", "background"])
+def test_sharded_load_error_is_not_hidden(lab, tmp_path, load):
+    path = str(tmp_path / "customers.json")
+    fill(sharded(lab, path), lab, *(f"Клиент {i}" for i in range(30)))
+    broken = shard_files(sharded(lab, path))[1]
+    rewrite(broken, '[{"customer_id": 1')
+
+    with pytest.raises(ValueError):
+        repo = sharded(lab, path, workers=1, load=load)
+        repo.add(customer(lab, "Новый"))
+        repo.write_to_file()
+    with open(broken, encoding="utf-8") as f:
+        assert f.read() == '[{"customer_id": 1'
+
+
+def journaled(lab, path, **kwargs):
+    return lab.Customer_rep_json(path, journal=True, **kwargs)
+
+
+def test_journal_replays_leftover_old_log_after_crash(lab, tmp_path):
+    path = str(tmp_path / "customers.json")
+    repo = journaled(lab, path)
+    repo.add_many(customer(lab, name) for name in ("Альфа", "Бета", "Гамма"))
+    repo.delete_by_id(2)
+    repo.replace_by_id(3, customer(lab, "Дельта"))
+    # Уплотнение прервано: журнал уже отложен в .old, а снимок не записан
+    os.replace(path + ".log", path + ".log.old")
+    assert not os.path.exists(path)
+
+    after_crash = journaled(lab, path)
+    assert names(after_crash) == ["ООО Альфа", "ООО Дельта"]
+    after_crash.add(customer(lab, "Эпсилон"))  # идёт в новый .log
+
+    reopened = journaled(lab, path)
+    assert ids(reopened) == [1, 3, 4]
+    reopened.compact(wait=True)
+    assert not os.path.exists(path + ".log.old") and not os.path.exists(path + ".log")
+    assert names(journaled(lab, path)) == ["ООО Альфа", "ООО Дельта", "ООО Эпсилон"]
+
+
+def test_journal_ignores_torn_last_line(lab, tmp_path):
+    path = str(tmp_path / "customers.json")
+    journaled(lab, path).add_many(customer(lab, name) for name in ("Альфа", "Бета"))
+    with open(path + ".log", "a", encoding="utf-8") as f:
+        f.write('{"op": "delete", "custo')
+
+    assert ids(journaled(lab, path)) == [1, 2]
+
+
+def test_changes_during_background_compaction_are_kept(lab, tmp_path):
+    path = str(tmp_path / "customers.json")
+    repo = journaled(lab, path, compact_threshold=1)
+    repo.add_many(customer(lab, f"Клиент {i}") for i in range(200))
+    repo.write_to_file()  # журнал больше порога: уплотнение в фоновом потоке
+    repo.delete_by_id(5)
+    repo.add(customer(lab, "Последний"))
+    repo._wait_compaction()
+
+    reopened = journaled(lab, path)
+    assert reopened.get_count() == 200
+    assert reopened.get_by_id(5) is None and reopened.get_by_id(201).name == "ООО Последний"
+    # Снимок не содержит изменений, сделанных после начала уплотнения
+    with open(path, encoding="utf-8") as f:
+        assert len(json.load(f)) == 200
+
+
+def jsonl_pair(lab, tmp_path, *customer_names):
+    path = str(tmp_path / "customers.jsonl")
+    reader = fill(lab.Customer_rep_jsonl(path), lab, *customer_names)
+    return path, reader, lab.Customer_rep_jsonl(path)
+
+
+def test_jsonl_refresh_reads_only_appended_lines(lab, tmp_path, monkeypatch):
+    path, reader, writer = jsonl_pair(lab, tmp_path, "Альфа", "Бета", "Гамма")
+    fill(writer, lab, "Дельта", "Эпсилон")
+
+    monkeypatch.setattr(reader, "read_from_file", pytest.fail)
+    assert reader.refresh()
+    assert ids(reader) == [1, 2, 3, 4, 5]
+    assert not reader.refresh()
+
+
+def test_jsonl_refresh_waits_for_complete_line(lab, tmp_path):
+    path, reader, writer = jsonl_pair(lab, tmp_path, "Альфа")
+    line = customer(lab, "Бета").to_json()
+    line = line.replace('"customer_id": 1', '"customer_id": 7')
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(line[:10])
+    assert not reader.refresh() and ids(reader) == [1]
+
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(line[10:] + "\n")
+    assert reader.refresh()
+    assert ids(reader) == [1, 7]
+
+
+def test_jsonl_refresh_rereads_rewritten_file(lab, tmp_path):
+    path, reader, writer = jsonl_pair(lab, tmp_path, "Альфа", "Бета")
+    # Файл переписан и стал длиннее: дочитывать хвост нельзя
+    writer.replace_by_id(1, customer(lab, "Альфа с очень длинным новым названием"))
+    fill(writer, lab, "Гамма")
+
+    assert reader.refresh()
+    assert names(reader) == ["ООО Альфа с очень длинным новым названием", "ООО Бета", "ООО Гамма"]
+
+
+def test_jsonl_iter_customers_keeps_read_offset(lab, tmp_path, monkeypatch):
+    path, reader, writer = jsonl_pair(lab, tmp_path, "Альфа", "Бета")
+    fill(writer, lab, "Гамма")
+
+    assert [c.customer_id for c in reader.iter_customers()] == [1, 2, 3]
+    monkeypatch.setattr(reader, "read_from_file", pytest.fail)
+    assert reader.refresh()
+    assert ids(reader) == [1, 2, 3]
+
+
+@pytest.fixture(params=[False, True], ids=["list", "columnar"])
+def indexed(lab, tmp_path, request):
+    repo = lab.Customer_rep_json(str(tmp_path / "customers.json"), columnar=request.param)
+    repo.add_many(customer(lab, f"Клиент {i:02d}") for i in range(1, 21))
+    return repo
+
+
+def assert_index_consistent(repo, expected_ids):
+    assert ids(repo) == expected_ids and repo.get_count() == len(expected_ids)
+    for c_id in expected_ids:
+        assert repo.get_by_id(c_id).customer_id == c_id
+
+
+def test_get_by_id_after_delete_uses_tombstones(indexed, lab):
+    indexed.delete_by_id(3)
+    indexed.delete_by_id(3)
+    # Одно надгробие из 20 — уплотнения ещё нет, позиции не сдвигались
+    assert indexed._tombstones
+    assert indexed.get_by_id(3) is None
+    assert_index_consistent(indexed, [i for i in range(1, 21) if i != 3])
+    assert indexed.replace_by_id(4, customer(lab, "Новый"))
+    assert indexed.get_by_id(4).name == "ООО Новый"
+    assert not indexed.replace_by_id(3, customer(lab, "Удалённый"))
+
+
+def test_get_by_id_after_compaction(indexed):
+    deleted = {2, 4, 6, 8, 10, 12}
+    for c_id in deleted:
+        indexed.delete_by_id(c_id)
+    # Больше TOMBSTONE_RATIO надгробий: список уплотнён, индекс перестроен
+    assert not indexed._tombstones
+    assert all(indexed.get_by_id(c_id) is None for c_id in deleted)
+    assert_index_consistent(indexed, [i for i in range(1, 21) if i not in deleted])
+
+    indexed.delete_many([1, 3, 5, 99])
+    indexed.sort_by_name()
+    assert_index_consistent(indexed, [7, 9, 11, 13, 14, 15, 16, 17, 18, 19, 20])
+
+
+def test_page_cursor_survives_delete_of_its_element(indexed):
+    page, cursor = indexed.get_page(5)
+    indexed.delete_by_id(5)
+    indexed.delete_by_id(6)
+    page, cursor = indexed.get_page(5, cursor)
+    assert [int(line.split(", ")[0][len("ID: "):]) for line in page] == [7, 8, 9, 10, 11]
+    assert cursor is not None
+
+
+def test_deleted_records_are_not_written(indexed, lab):
+    indexed.delete_by_id(1)
+    indexed.write_to_file()
+    reloaded = lab.Customer_rep_json(indexed._file_path)
+    assert reloaded.get_by_id(1) is None and reloaded.get_count() == 19
+    # ID удалённого клиента не выдаётся повторно
+    reloaded.add(customer(lab, "Новый"))
+    assert reloaded.get_by_id(21).name == "ООО Новый"
@@ -0,0 +1,81 @@
+"""Тесты репозитория клиентов lr3."""
+
+import pytest
+
+from lr3.customer_repository import CustomerRepository
+
+
+@pytest.fixture
+def repository(tmp_path):
+    repository = CustomerRepository(str(tmp_path / "customers.json"))
+    for name in ("Вера", "Анна", "Борис"):
+        repository.add({
+            "name": f"ООО {name}",
+            "address": "г. Москва, ул. Ленина, д. 1",
+            "phone": f"+7916{len(name):07d}",
+            "contact_person": f"{name} Иванова",
+        })
+    return repository
+
+
+def ids(customers):
+    return [c.customer_id for c in customers]
+
+
+def test_query_sorts_by_known_field(repository):
+    result = repository.query(1, 10, sort_by="name")
+    assert ids(result.items) == [2, 3, 1]
+    assert (result.total, result.total_pages) == (3, 1)
+
+
+def test_query_ignores_unknown_sort_field(repository):
+    # Значение приходит из ?sort= и не должно приводить к ошибке 500
+    result = repository.query(1, 2, sort_by="foo")
+    assert ids(result.items) == [1, 2]
+    assert (result.total, result.total_pages) == (3, 2)
+
+
+def test_query_ignores_unknown_sort_field_with_filter(repository):
+    result = repository.query(1, 10, lambda c: c.customer_id != 2, sort_by="foo")
+    assert ids(result.items) == [1, 3]
+    assert result.total == 2
+
+
+def test_get_k_n_short_list_ignores_unknown_sort_field(repository):
+    assert ids(repository.get_k_n_short_list(1, 10, sort_by="foo")) == [1, 2, 3]
+
+
+def test_get_page_ignores_unknown_sort_field(repository):
+    page, cursor = repository.get_page(2, sort_by="foo")
+    assert ids(page) == [1, 2]
+    page, cursor = repository.get_page(2, cursor, sort_by="foo")
+    assert ids(page) == [3] and cursor is None
+
+
+def test_delete_skips_tombstones_in_reads_and_file(repository, tmp_path):
+    repository.query(1, 10, sort_by="name")  # индекс по имени уже построен
+    assert repository.delete(2)
+    assert not repository.delete(2)
+    assert repository.get_by_id(2) is None
+    assert ids(repository.query(1, 10).items) == [1, 3]
+    assert ids(repository.query(1, 10, sort_by="name").items) == [3, 1]
+    page, cursor = repository.get_page(1, sort_by="name")
+    assert ids(page) == [3] and ids(repository.get_page(1, cursor, sort_by="name")[0]) == [1]
+
+    reloaded = CustomerRepository(str(tmp_path / "customers.json"))
+    assert ids(reloaded.query(1, 10).items) == [1, 3]
+
+
+def test_delete_compacts_and_keeps_order(repository):
+    for c_id in (1, 3):
+        repository.delete(c_id)
+    repository.add({
+        "name": "ООО Глеб",
+        "address": "г. Тула, ул. Мира, д. 5",
+        "phone": "+79160000042",
+        "contact_person": "Глеб Петров",
+    })
+    # Новый ID — наибольший живой ID + 1: надгробие ID 3 в индексе оживает
+    assert ids(repository.query(1, 10).items) == [2, 3]
+    assert ids(repository.query(1, 10, sort_by="customer_id", reverse=True).items) == [3, 2]
+    assert repository.get_by_id(3).name == "ООО Глеб"
@@ -0,0 +1,37 @@
+"""Тесты потоковой записи JSON и YAML."""
+
+import io
+import json
+
+import pytest
+
+from stream_writers import write_json_array, write_yaml_sequence
+
+RECORDS = [
+    {"customer_id": i, "name": f"Клиент {i}", "address": "Москва", "phone": f"+7900{i:07d}"}
+    for i in range(1, 6)
+]
+
+
+def written(writer, records, **kwargs):
+    f = io.StringIO()
+    writer(f, iter(records), **kwargs)
+    return f.getvalue()
+
+
+@pytest.mark.parametrize("records", [RECORDS, RECORDS[:1], []])
+def test_json_array_matches_json_dump(records):
+    assert written(write_json_array, records) == json.dumps(records, ensure_ascii=False, indent=4)
+
+
+@pytest.mark.parametrize("records", [RECORDS, []])
+def test_json_array_compact(records):
+    text = written(write_json_array, records, indent=None)
+    assert text == json.dumps(records, ensure_ascii=False, separators=(",", ":"))
+
+
+@pytest.mark.parametrize("records", [RECORDS, []])
+def test_yaml_sequence_in_chunks_reads_back(records):
+    yaml = pytest.importorskip("yaml")
+    text = written(write_yaml_sequence, records, chunk_size=2)
+    assert yaml.safe_load(text) == records